@@ -1,9 +1,12 @@
 import random
-import torch
+import numpy as np
 
-from copy import deepcopy
-from utils import *
-from neural_network import ActionNetwork, PredictionNetwork
+from typing import TYPE_CHECKING
+from numpy_network import action_forward
+
+# The networks are built by the genomes, the agents run them with numpy so that the simulations do not need torch
+if TYPE_CHECKING:
+    from neural_network import ActionNetwork
 
 
 class Agent:
@@ -13,7 +16,12 @@ class Agent:
 
     id = 0
 
-    def __init__(self, action_network:ActionNetwork, prediction_network:PredictionNetwork, sensor_range_0:float, sensor_range_1:float, speed:float, noise) -> None:
+    def __init__(self, action_network:"ActionNetwork", sensor_range_0:float, sensor_range_1:float, speed:float, noise, rng:np.random.Generator=None) -> None:
+        """
+        The agent runs the action network of its genome, whose weights are shared by all of the genome's agents
+        The initial direction is drawn from the given generator, from the process' random module by default
+        """
+
         self.id = Agent.id
         Agent.id += 1
 
@@ -30,26 +38,23 @@ class Agent:
         self.speed = speed
         self.noise = noise
 
-        self.direction = random.choice([-1, 1])
+        self.direction = random.choice([-1, 1]) if rng is None else int(rng.choice([-1, 1]))
         self.position = None
 
-        self.action_network = deepcopy(action_network)
-        self.prediction_network = deepcopy(prediction_network)
+        self.action_network = action_network
 
         self.score = 0 # The sum of correct predictions over the existence of the agent
-        self.position_history = [] # The history of the agent's positions
     
-    def reset(self) -> None:
+    def reset(self, rng:np.random.Generator=None) -> None:
         """
-        Reset the agent
+        Reset the agent, its direction is drawn from the given generator, from the process' random module by default
         """
 
         self.reset_sensors()
-        self.direction = random.choice([-1, 1])
+        self.direction = random.choice([-1, 1]) if rng is None else int(rng.choice([-1, 1]))
 
         self.score = 0
         self.distance_traveled = 0
-        self.position_history = []
 
         self.sensor_0_activation_count = [0, 0]
         self.sensor_1_activation_count = [0, 0]        
@@ -72,26 +77,31 @@ class Agent:
 
         self.score += score_0 + score_1
 
-    def take_decision(self) -> None:
+    def network_input(self) -> list:
         """
-        Changes the agent's direction based on its action network
+        Returns the input of the agent's networks
         """
 
-        nn_input = torch.Tensor([self.direction > 0, *self.sensor_0, *self.sensor_1])
-        nn_output = self.action_network.forward(nn_input)
+        return [self.direction > 0, *self.sensor_0, *self.sensor_1]
 
-        self.direction = int(torch.round(2 * nn_output - 1))
+    def take_decision(self, direction:int=None) -> None:
+        """
+        Changes the agent's direction, computed with its action network if not given
+        """
+
+        if direction is None:
+            nn_output = action_forward(self.action_network.to_numpy(), np.array([self.network_input()], dtype=np.float32))
+            direction = int(np.round(2 * nn_output[0, 0] - 1))
+
+        self.direction = direction
     
-    def predict_sensors(self) -> None:
+    def predict_sensors(self, prediction:list) -> None:
         """
-        Predicts the state of the sensors with the prediction network
+        Reads the state of the sensors predicted for this agent by its genome's prediction network
         """
 
-        nn_input = torch.Tensor([self.direction > 0, *self.sensor_0, *self.sensor_1])[None, None, :]
-        nn_output = torch.squeeze(self.prediction_network.forward(nn_input))
-        
-        self.sensor_0_prediction = [bool(pred) for pred in torch.round(nn_output)[:2]]
-        self.sensor_1_prediction = [bool(pred) for pred in torch.round(nn_output)[2:]]
+        self.sensor_0_prediction = [bool(pred) for pred in prediction[:2]]
+        self.sensor_1_prediction = [bool(pred) for pred in prediction[2:]]
         
     def __str__(self):
         return "Agent {}:\tposition: {}\tdirection: {}\tsensors 0: {}\tsensors 1: {}".format(self.id, self.position, self.direction, self.sensor_0, self.sensor_1)
\ No newline at end of file
@@ -0,0 +1,177 @@
+import os
+import sys
+import time
+import argparse
+import importlib
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def _init_worker():
+    """
+    Keeps each worker process on a single thread, the parallelism comes from the processes
+    The simulations run with numpy, torch is only limited if the worker inherited it
+    """
+
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(1)
+
+
+class SerialBackend:
+    """
+    Evaluates the tasks one after another in the current process
+    """
+
+    name = "serial"
+
+    def __init__(self, nb_workers=None) -> None:
+        self.nb_workers = 1
+
+    def map(self, function, iterable) -> list:
+        """
+        Returns the results of the function applied to each element, in order
+        """
+
+        return list(map(function, iterable))
+
+    def map_unordered(self, function, iterable):
+        """
+        Yields the results of the function applied to each element, as soon as they are computed
+        """
+
+        for element in iterable:
+            yield function(element)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ProcessPoolBackend(SerialBackend):
+    """
+    Evaluates the tasks in a pool of local processes
+    """
+
+    name = "process"
+
+    def __init__(self, nb_workers=None, start_method=None) -> None:
+        """
+        start_method is the way the workers are started (fork, spawn or forkserver), the platform's default if None
+        """
+
+        self.nb_workers = os.cpu_count() if nb_workers is None else nb_workers
+        context = None if start_method is None else multiprocessing.get_context(start_method)
+        self.executor = ProcessPoolExecutor(max_workers=self.nb_workers, mp_context=context, initializer=_init_worker)
+
+    def map(self, function, iterable) -> list:
+        """
+        Returns the results of the function applied to each element, in order
+        """
+
+        return list(self.executor.map(function, iterable))
+
+    def map_unordered(self, function, iterable):
+        """
+        Yields the results of the function applied to each element, as soon as they are computed
+        """
+
+        for future in as_completed([self.executor.submit(function, element) for element in iterable]):
+            yield future.result()
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+
+class ScoopBackend(SerialBackend):
+    """
+    Evaluates the tasks with scoop, the program must be started with python -m scoop
+    """
+
+    name = "scoop"
+
+    def __init__(self, nb_workers=None) -> None:
+        import scoop
+        from scoop import futures
+        self.futures = futures
+
+        if nb_workers is None:
+            nb_workers = getattr(scoop, "SIZE", None) or os.cpu_count()
+        self.nb_workers = nb_workers
+
+    def map(self, function, iterable) -> list:
+        """
+        Returns the results of the function applied to each element, in order
+        """
+
+        return list(self.futures.map(function, iterable))
+
+    def map_unordered(self, function, iterable):
+        """
+        Yields the results of the function applied to each element, as soon as they are computed
+        """
+
+        for future in self.futures.as_completed([self.futures.submit(function, element) for element in iterable]):
+            yield future.result()
+
+
+BACKENDS = {backend.name:backend for backend in [SerialBackend, ProcessPoolBackend, ScoopBackend]}
+
+
+def make_backend(name="serial", nb_workers=None, **kwargs):
+    """
+    Returns the evaluation backend of the given name, kwargs are given to the backend
+    """
+
+    try:
+        backend = BACKENDS[name]
+    except KeyError:
+        raise ValueError("Unknown backend {}, choose among {}".format(name, list(BACKENDS)))
+
+    return backend(nb_workers=nb_workers, **kwargs)
+
+
+def _worker_startup(modules) -> tuple:
+    """
+    Imports the given modules in a worker, returns its pid and the time spent importing them
+    """
+
+    start = time.perf_counter()
+    for module in modules:
+        importlib.import_module(module)
+
+    return os.getpid(), time.perf_counter() - start
+
+
+def measure_startup(backend, modules=("evaluation",)) -> dict:
+    """
+    Measures the time a backend takes to run a first task on each of its workers, the task importing the modules the simulations need
+    Returns the elapsed time, the number of processes reached and the longest import time of a worker
+    """
+
+    start = time.perf_counter()
+    results = backend.map(_worker_startup, [modules] * backend.nb_workers)
+    elapsed = time.perf_counter() - start
+
+    return {"elapsed":elapsed, "nb_processes":len({pid for pid, _ in results}), "import_time":max(import_time for _, import_time in results)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures the startup latency of the workers of a backend")
+    parser.add_argument("--backend", type=str, default="process", choices=list(BACKENDS), help="evaluation backend")
+    parser.add_argument("--nb_workers", type=int, default=None, help="number of workers, all the cores by default")
+    parser.add_argument("--start_method", type=str, default=None, choices=["fork", "spawn", "forkserver"], help="start method of the process backend")
+    parser.add_argument("--modules", type=str, nargs="+", default=["evaluation"], help="modules imported by the workers")
+    args = parser.parse_args()
+
+    kwargs = {} if args.start_method is None else {"start_method":args.start_method}
+    with make_backend(args.backend, nb_workers=args.nb_workers, **kwargs) as backend:
+        startup = measure_startup(backend, modules=args.modules)
+
+    print("{} workers of the {} backend started in {:.3f}s over {} processes, importing {} took up to {:.3f}s".format(
+        backend.nb_workers, backend.name, startup["elapsed"], startup["nb_processes"], " ".join(args.modules), startup["import_time"]))
@@ -0,0 +1,145 @@
+import os
+import random
+import numpy as np
+
+from fitness_cache import get_fitness_cache
+from checkpoint import Checkpoint, seed_rng
+from evolution import Evolution, RESULTS_PATH, genome_vector, write_evolution
+from results_store import ResultsStore
+
+
+TASK_CHECKPOINT_PATH = "Results/{}_checkpoint_L={}_run={}.pkl" # prefix, mapsize, run
+CAMPAIGN_CHECKPOINT_PATH = "Results/{}_checkpoint_campaign_L={}.pkl" # prefix, mapsizes
+
+
+def evolve_task(arguments):
+    """
+    Evolves a genome once on a map size and scores its last generation, arguments are ((ring_length, run), parameters)
+    parameters hold the content of parameters.json, the genome vector, max_generations, length_score, the task's seed, the checkpoint prefix
+    whether the evaluated solutions are recorded and the configuration of the fitness cache
+    Returns the task, its gen fitness, fitness, covered distance, entropy and cluster ratio, and its evaluated solutions with the scores of the last ones
+    """
+
+    (length, run), parameters = arguments
+    seed_rng(parameters["seed"])
+
+    fitness_cache = None if parameters["fitness_cache"] is None else get_fitness_cache(**parameters["fitness_cache"])
+    evolution = Evolution.from_parameters(parameters["parameters"], ring_length=length, length_score=parameters["length_score"], verbose=False,
+        fitness_cache=fitness_cache, seed=parameters["seed"])
+    evolution.record_evaluated = parameters["record_evaluated"]
+
+    # The task is resumed from its last saved generation, if any
+    checkpoint = None
+    if parameters["checkpoint_prefix"] is not None:
+        checkpoint = Checkpoint(TASK_CHECKPOINT_PATH.format(parameters["checkpoint_prefix"], length, run), every=parameters["checkpoint_every"])
+    state = {} if checkpoint is None else checkpoint.load({"task":(length, run), "seed":parameters["seed"]})
+
+    gen_fitness, solutions = evolution.evolve(parameters["max_generations"], np.asarray(parameters["genome"], dtype=np.float32), state=state.setdefault("evolution", {}), checkpoint=checkpoint)
+    scores = evolution.score_each(solutions, seed=[*state["evolution"]["seed"], 1])
+    covered_distance, entropy, cluster_ratio = np.mean(scores, axis=0)
+
+    return (length, run), (gen_fitness, np.max(gen_fitness), covered_distance, entropy, cluster_ratio), (state["evolution"]["evaluated"], scores)
+
+
+class Campaign:
+    """
+    An evolution campaign expanded into independent (ring length, run) tasks, spread over the workers of a backend
+    The results of each task are appended to the result files as soon as it is done,
+    the results store then merges the runs of a map size into a single chunk once they are all done
+    """
+
+    def __init__(self, parameters:dict, lengths:list, nb_runs:int, max_generations:int, genome_to_evolve, output_prefix:str, is_iterated=True, length_score=500, seed=None, checkpoint_every=1, results_path=RESULTS_PATH, hall_of_fame=None, fitness_cache=None) -> None:
+        """
+        parameters is the content of parameters.json, each task is seeded from seed and its (ring length, run)
+        checkpoint_every is the number of generations between the checkpoints of a task, 0 disables checkpoints
+        The results are written in the results store, and in csv files too unless results_path is None
+        Every evaluated solution is added to the hall of fame, if any
+        fitness_cache is the configuration of the workers' fitness caches, as the arguments of get_fitness_cache, by default there is none
+        """
+
+        self.parameters = parameters
+        self.lengths = lengths
+        self.nb_runs = nb_runs
+        self.max_generations = max_generations
+        self.genome = genome_vector(genome_to_evolve)
+
+        self.output_prefix = output_prefix
+        self.is_iterated = is_iterated
+        self.length_score = length_score
+        self.results_path = results_path
+        self.hall_of_fame = hall_of_fame
+        self.fitness_cache = fitness_cache
+
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.checkpoint_every = checkpoint_every
+
+    def tasks(self) -> list:
+        """
+        Returns the (ring length, run) pairs of the campaign
+        """
+
+        return [(length, run) for length in self.lengths for run in range(self.nb_runs)]
+
+    def _task_parameters(self, task) -> dict:
+        """
+        Returns the parameters sent to the worker evolving the task
+        """
+
+        return {"parameters":self.parameters, "genome":self.genome, "max_generations":self.max_generations, "length_score":self.length_score,
+            "seed":int(np.random.SeedSequence([self.seed, *task]).generate_state(1)[0]),
+            "checkpoint_prefix":self.output_prefix if self.checkpoint_every > 0 else None, "checkpoint_every":self.checkpoint_every,
+            "record_evaluated":self.hall_of_fame is not None, "fitness_cache":self.fitness_cache}
+
+    def _metadata(self, length:int, runs:list) -> dict:
+        """
+        Returns the description of the given runs of a map size in the results store
+        """
+
+        return {"parameters":self.parameters, "max_generations":self.max_generations, "length_score":self.length_score,
+            "genome_dim":len(self.genome), "seeds":[self._task_parameters((length, run))["seed"] for run in runs]}
+
+    def run(self, backend) -> None:
+        """
+        Runs the tasks that are not done yet and writes their results as they complete
+        Once all the runs of a map size are done, their chunks of the results store are merged into one
+        """
+
+        checkpoint = None
+        done = set()
+        chunks = {} # length:[index entries], the chunks written for the runs of each map size
+        if self.checkpoint_every > 0:
+            # Campaigns of the same prefix on other map sizes, such as separate --ring_length jobs, have their own checkpoints
+            checkpoint = Checkpoint(CAMPAIGN_CHECKPOINT_PATH.format(self.output_prefix, ",".join(str(length) for length in self.lengths)))
+            state = checkpoint.load({"parameters":self.parameters, "lengths":self.lengths, "nb_runs":self.nb_runs, "max_generations":self.max_generations,
+                "length_score":self.length_score})
+
+            # A resumed campaign keeps its genome and seed so that its tasks resume their own checkpoints
+            self.genome = state.setdefault("genome", self.genome)
+            self.seed = state.setdefault("seed", self.seed)
+            done = state.setdefault("done", set())
+            chunks = state.setdefault("chunks", {})
+            checkpoint.save()
+
+        tasks = [task for task in self.tasks() if task not in done]
+        print("Running {} tasks of the campaign {} ({} already done) with the {} backend".format(len(tasks), self.output_prefix, len(done), backend.name))
+
+        store = ResultsStore()
+        for i, (task, results, (evaluated, scores)) in enumerate(backend.map_unordered(evolve_task, [(task, self._task_parameters(task)) for task in tasks])):
+            length, run = task
+            chunk = write_evolution(self.results_path, self.output_prefix, length, self.is_iterated, *[[result] for result in results],
+                runs=[run], metadata=self._metadata(length, [run]), store=store)
+            if self.hall_of_fame is not None:
+                self.hall_of_fame.add_run(length, run, evaluated, scores)
+            print("Task {}/{} done: run {} with a map size of {}, fitness {:.3f}".format(i+1, len(tasks), run+1, length, results[1]))
+
+            done.add(task)
+            chunks.setdefault(length, []).append(chunk)
+            if len(chunks[length]) == self.nb_runs:
+                store.merge(chunks.pop(length), metadata=self._metadata(length, range(self.nb_runs)))
+
+            if checkpoint is not None:
+                checkpoint.save()
+
+                task_checkpoint = TASK_CHECKPOINT_PATH.format(self.output_prefix, length, run)
+                if os.path.exists(task_checkpoint):
+                    os.remove(task_checkpoint)
@@ -0,0 +1,106 @@
+import os
+import sys
+import pickle
+import random
+
+import numpy as np
+
+
+CHECKPOINT_PATH = "Results/{}_checkpoint_L={}.pkl" # prefix, mapsize
+
+
+def get_rng_states() -> dict:
+    """
+    Returns the states of the random generators of the process, torch's one only if the process uses torch
+    """
+
+    states = {"random":random.getstate(), "numpy":np.random.get_state()}
+    if "torch" in sys.modules:
+        states["torch"] = sys.modules["torch"].get_rng_state()
+
+    return states
+
+
+def seed_rng(seed:int) -> None:
+    """
+    Seeds the random generators of the process
+    """
+
+    random.seed(seed)
+    np.random.seed(seed)
+
+    # The simulations do not need torch, it is only seeded if the process uses it
+    if "torch" in sys.modules:
+        sys.modules["torch"].manual_seed(seed)
+
+
+def set_rng_states(states:dict) -> None:
+    """
+    Restores the states of the random generators of the process
+    """
+
+    random.setstate(states["random"])
+    np.random.set_state(states["numpy"])
+    if "torch" in states and "torch" in sys.modules:
+        sys.modules["torch"].set_rng_state(states["torch"])
+
+
+class Checkpoint:
+    """
+    The state of an evolution campaign saved in a file, so that an interrupted campaign resumes from its last saved generation
+    The state is a dictionary filled by the evolution process, it is saved along with the random generators' states
+    """
+
+    def __init__(self, path:str, every=1) -> None:
+        """
+        The state is saved every given number of generations, and at the end of each run
+        """
+
+        self.path = path
+        self.every = every
+
+        self.key = None
+        self.state = {}
+
+    def load(self, key) -> dict:
+        """
+        Returns the saved state of the campaign, or a new state if there is no checkpoint
+        key describes the campaign, a checkpoint made for another campaign is refused
+        """
+
+        self.key = key
+        self.state = {}
+
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                saved = pickle.load(f)
+
+            if saved["key"] != key:
+                raise ValueError("The checkpoint {} was made for another campaign, remove it or change the output prefix".format(self.path))
+
+            self.state = saved["state"]
+            set_rng_states(saved["rng"])
+
+        return self.state
+
+    def save(self) -> None:
+        """
+        Writes the current state, the previous checkpoint is only replaced once the new one is complete
+        """
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        with open(self.path + ".tmp", "wb") as f:
+            pickle.dump({"key":self.key, "state":self.state, "rng":get_rng_states()}, f)
+        os.replace(self.path + ".tmp", self.path)
+
+    def is_due(self, generation:int) -> bool:
+        return self.every > 0 and generation % self.every == 0
+
+    def clear(self) -> None:
+        """
+        Removes the checkpoint file
+        """
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
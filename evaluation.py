@@ -0,0 +1,166 @@
+import numpy as np
+
+from collections import OrderedDict
+
+from population import Population
+from map_ring_vectorized import VectorizedRing
+from metrics import make_metrics
+from random_streams import RandomStreams, candidate_keys
+from swarm import Swarm
+
+
+SCORE_METRICS = ("distance", "entropy", "ratio") # Metrics scoring the last generation, see metrics.py
+
+
+# Evaluators reused by every evaluation of the process, by simulation parameters and population size
+_evaluators = OrderedDict()
+max_cached_evaluators = 4
+
+
+def get_evaluator(ring_length:int, nb_agents:int, agent_param:dict, length:int, nb_runs=1, resolution:float=None):
+    """
+    Returns the evaluator of the process for the given simulation parameters, the least recently used ones are released
+    """
+
+    key = (ring_length, nb_agents, tuple(sorted(agent_param.items())), length, nb_runs, resolution)
+
+    if key not in _evaluators:
+        _evaluators[key] = PopulationEvaluator(ring_length=ring_length, nb_agents=nb_agents, agent_param=agent_param, length=length, nb_runs=nb_runs, resolution=resolution)
+        while len(_evaluators) > max_cached_evaluators:
+            _evaluators.popitem(last=False)
+
+    _evaluators.move_to_end(key)
+    return _evaluators[key]
+
+
+def evaluate_solutions(arguments):
+    """
+    Returns the fitness of a chunk of solutions, arguments are (solutions, parameters) with the parameters of the PopulationEvaluator,
+    the seed of the evaluation and whether it uses common random numbers
+    Only the genome vectors and the simulation parameters are sent to the worker processes
+    """
+
+    solutions, parameters = arguments
+    parameters = dict(parameters)
+    seed, common_random_numbers = parameters.pop("seed", None), parameters.pop("common_random_numbers", False)
+
+    return get_evaluator(**parameters).evaluate(solutions, seed=seed, common_random_numbers=common_random_numbers)
+
+
+class PopulationEvaluator:
+    """
+    Computes the fitness of a whole population of genomes, simulating all of their swarms in lockstep on a ring
+    The population and its swarms are allocated once and reused as long as the population size does not change
+    """
+
+    def __init__(self, ring_length:int, nb_agents:int, agent_param:dict, length:int, nb_runs=1, resolution:float=None) -> None:
+        self.map = VectorizedRing(ring_length=ring_length, resolution=resolution)
+
+        self.nb_agents = nb_agents
+        self.agent_param = agent_param
+
+        self.length = length
+        self.nb_runs = nb_runs
+
+        self.population = None
+        self.swarm = None
+
+    def _allocate(self, solutions) -> None:
+        """
+        Allocates the population and its swarms for the size of the given solutions
+        """
+
+        self.population = Population(solutions, self.nb_agents * self.nb_runs)
+        self.swarm = Swarm(self.population, self.nb_agents, batch_shape=(len(self.population), self.nb_runs), record_history=False, **self.agent_param)
+
+    def evaluate(self, solutions, seed=None, common_random_numbers=False) -> np.ndarray:
+        """
+        Returns the fitness of each row of a (population x genome_dim) matrix, averaged over a number of runs
+        The runs are independent swarms simulated together, each with its own initial positions and noise drawn from the streams
+        of its (solution, run), see random_streams.py
+        With common random numbers, the run of every solution starts from the same positions and gets the same noise
+        """
+
+        solutions = np.asarray(solutions)
+        streams = RandomStreams(seed, candidate_keys(solutions), self.nb_runs, common=common_random_numbers)
+
+        if self.population is None or len(self.population) != len(solutions):
+            self._allocate(solutions)
+
+        # The agents of a genome start from the same hidden state, drawn from the stream of its first run
+        self.population.load(solutions, hidden=streams.standard_normal((len(solutions), self.nb_runs, self.population.hidden_size))[:, 0])
+
+        self.map.reset_swarm(self.swarm, keep_predictions=False, streams=streams)
+        for _ in range(self.length):
+            self.map.step_swarm(self.swarm)
+
+        return np.mean(self.swarm.compute_fitness(self.length), axis=-1)
+
+
+class ScoringArena:
+    """
+    A swarm allocated once, then reused to score every solution given to a worker
+    The metrics are updated during the run, so no position history is kept
+    """
+
+    def __init__(self, ring_length:int, nb_agents:int, agent_param:dict, metrics=SCORE_METRICS) -> None:
+        self.map = VectorizedRing(ring_length=ring_length)
+
+        self.ring_length = ring_length
+        self.nb_agents = nb_agents
+        self.agent_param = agent_param
+        self.metrics = metrics
+
+        self.population = None
+        self.swarm = None
+
+    def _allocate(self, solutions) -> None:
+        """
+        Allocates a population of one genome and its swarm
+        """
+
+        self.population = Population(solutions, self.nb_agents)
+        self.swarm = Swarm(self.population, self.nb_agents, batch_shape=(1,), record_history=False, **self.agent_param)
+        self.swarm.track(make_metrics(self.metrics, self.ring_length))
+
+    def score(self, solution, length:int, seed=None, common_random_numbers=False):
+        """
+        Runs a solution once, as a new genome would be, with the random streams of the solution and seed
+        Returns the value of each metric of the solution
+        """
+
+        solutions = np.asarray(solution, dtype=np.float32)[None, :]
+        streams = RandomStreams(seed, candidate_keys(solutions), common=common_random_numbers)
+
+        if self.population is None:
+            self._allocate(solutions)
+
+        # A new genome starts from a random hidden state, without predictions
+        self.population.load(solutions, hidden=streams.standard_normal((1, 1, self.population.hidden_size))[:, 0])
+
+        self.map.reset_swarm(self.swarm, keep_predictions=False, streams=streams)
+        for _ in range(length):
+            self.map.step_swarm(self.swarm)
+
+        return tuple(float(value[0]) for value in self.swarm.compute_metrics().values())
+
+
+# Arena of the process, replaced when the simulation parameters change
+_scoring_arena = {"key":None, "arena":None}
+
+
+def score_solution(arguments):
+    """
+    Runs a solution once, arguments are (solution, parameters) with parameters holding ring_length, nb_agents, agent_param, length,
+    the seed of the run and whether it uses common random numbers
+    Returns the covered distance, entropy and cluster ratio of the solution
+    """
+
+    solution, parameters = arguments
+
+    key = (parameters["ring_length"], parameters["nb_agents"], tuple(sorted(parameters["agent_param"].items())))
+    if _scoring_arena["key"] != key:
+        _scoring_arena["key"] = key
+        _scoring_arena["arena"] = ScoringArena(ring_length=parameters["ring_length"], nb_agents=parameters["nb_agents"], agent_param=parameters["agent_param"])
+
+    return _scoring_arena["arena"].score(solution, parameters["length"], seed=parameters.get("seed"), common_random_numbers=parameters.get("common_random_numbers", False))
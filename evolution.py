@@ -0,0 +1,379 @@
+import json
+import random
+import numpy as np
+
+from backends import SerialBackend
+from evaluation import evaluate_solutions, score_solution
+from results_store import ResultsStore
+
+
+RESULTS_PATH = "Results/{}_{}_L={}.csv" # prefix, type, mapsize
+
+
+def load_parameters(path="parameters.json") -> dict:
+    """
+    Loads the simulation and evolution parameters from a json file
+    """
+
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def genome_vector(genome) -> np.ndarray:
+    """
+    Returns the flattened weights of a Genome, a genome given as a vector is returned as is
+    """
+
+    return genome if isinstance(genome, np.ndarray) else np.asarray(genome.to_tensor())
+
+
+def write_evolution(path, output_prefix, length, is_iterated, conc_gen_fitness, conc_fitness, conc_distance, conc_entropy, conc_ratio, runs=None, metadata=None, store=None):
+    """
+    Writes the evolution process' results in the results store, and in separate csv files with given prefix unless path is None
+    runs holds the run number of each result, 0 to the number of results by default
+    Returns the index entry of the results in the store
+    """
+
+    store = ResultsStore() if store is None else store
+    chunk = store.append(output_prefix, length, is_iterated, conc_gen_fitness, conc_fitness, conc_distance, conc_entropy, conc_ratio, runs=runs, metadata=metadata)
+
+    if path is not None:
+        store.export_csv(path, chunks=[chunk])
+
+    return chunk
+
+
+class Evolution:
+    """
+    Evolves genomes with CMA-ES on a ring map, without any graphical interface
+    """
+
+    def __init__(self, ring_length=25, length_fitness=100, length_score=500, nb_run_fitness=1, nb_agents=20, agent_param={"sensor_range_0":.5, "sensor_range_1":1.0, "speed":.1, "noise":.01}, population_size=None, backend=None, verbose=True, fitness_cache=None, seed=None, common_random_numbers=False, racing_eta=0, racing_rungs=3):
+        """
+        backend evaluates the genomes, see backends.py, by default they are evaluated in the current process
+        fitness_cache keeps the fitness and scores of the simulated genomes, see fitness_cache.py, by default every genome is simulated
+        seed seeds the simulations of each run, drawn from the process' generator by default
+        With common_random_numbers, every genome of a generation is simulated from the same configurations with the same noise,
+        which lowers the variance of their ranking
+        With a racing_eta above 1, the genomes of a generation are raced over racing_rungs evaluations of increasing length and number of runs,
+        and only the ones that can be selected by CMA-ES get the full evaluation, see _race
+        """
+
+        self.ring_length = ring_length
+
+        self.length_fitness = length_fitness
+        self.length_score = length_score
+        self.nb_run_fitness = nb_run_fitness
+
+        self.nb_agents = nb_agents
+        self.agent_param = agent_param
+
+        self.population_size = population_size
+        self.backend = SerialBackend() if backend is None else backend
+        self.fitness_cache = fitness_cache
+
+        self.seed = seed
+        self.common_random_numbers = common_random_numbers
+
+        self.racing_eta = racing_eta
+        self.racing_rungs = racing_rungs
+        self.nb_simulated_steps = 0 # Steps simulated by the evaluations, summed over the runs and genomes
+        self.is_fully_evaluated = None # Whether each solution of the last evaluation got the full one, the others have a capped estimate
+
+        self.solutions = None # Solutions of the last run
+        self.verbose = verbose
+
+        # Whether evolve keeps every evaluated solution in its state, for the hall of fame
+        self.record_evaluated = False
+
+    @classmethod
+    def from_parameters(cls, parameters:dict, ring_length:int, length_score=500, backend=None, verbose=True, fitness_cache=None, seed=None):
+        """
+        Creates the evolution process described by the content of parameters.json
+        elitism and mutation_rate are not used by CMA-ES
+        """
+
+        agents, evolution = parameters["agents"], parameters["evolution"]
+
+        noise = agents["noise"]
+        agent_param = {
+            "sensor_range_0":agents["sensor_range_0"], "sensor_range_1":agents["sensor_range_1"], "speed":agents["speed"],
+            "noise":max(abs(n) for n in noise) if isinstance(noise, list) else noise}
+
+        return cls(ring_length=ring_length, length_fitness=evolution["evaluation_length"], length_score=length_score,
+            nb_run_fitness=evolution["nb_sim_run_per_evaluation"], nb_agents=agents["swarm_size"], agent_param=agent_param,
+            population_size=evolution["population_size"], backend=backend, verbose=verbose, fitness_cache=fitness_cache,
+            seed=seed, common_random_numbers=evolution.get("common_random_numbers", False),
+            racing_eta=evolution.get("racing_eta", 0), racing_rungs=evolution.get("racing_rungs", 3))
+
+    def _simulation_parameters(self, length:int) -> dict:
+        """
+        Returns the parameters sent to the workers along with the genome vectors
+        """
+
+        return {"ring_length":self.ring_length, "nb_agents":self.nb_agents, "agent_param":self.agent_param, "length":length}
+
+    def _cached(self, solutions, parameters:dict, simulate) -> np.ndarray:
+        """
+        Returns the (N_solutions x N_results) results of simulate for each solution, only the ones missing from the fitness cache are simulated
+        Unseeded simulations are not reproducible, so they are always simulated and never cached
+        """
+
+        solutions = np.asarray(solutions)
+        if self.fitness_cache is None or parameters["seed"] is None:
+            return np.array(simulate(solutions)).reshape(len(solutions), -1)
+
+        keys = [self.fitness_cache.key(solution, parameters) for solution in solutions]
+        results = self.fitness_cache.get_many(keys)
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if len(missing) != 0:
+            simulated = np.array(simulate(solutions[missing])).reshape(len(missing), -1)
+            self.fitness_cache.put_many([keys[i] for i in missing], simulated)
+
+            for i, result in zip(missing, simulated):
+                results[i] = result
+
+        return np.stack(results)
+
+    def _simulate_fitness(self, solutions, parameters:dict) -> np.ndarray:
+        """
+        Simulates the fitness of each solution, the population is split in one chunk per worker of the backend
+        """
+
+        chunks = [chunk for chunk in np.array_split(solutions, self.backend.nb_workers) if len(chunk) != 0]
+        self.nb_simulated_steps += len(solutions) * parameters["nb_runs"] * parameters["length"]
+
+        return np.concatenate(self.backend.map(evaluate_solutions, [(chunk, parameters) for chunk in chunks]))
+
+    def _evaluate_rung(self, solutions, seed, nb_runs:int, length:int) -> np.ndarray:
+        """
+        Returns the fitness of each solution averaged over nb_runs runs of the given length
+        The runs are the first ones of a longer evaluation with more runs, as they are drawn from the same streams
+        """
+
+        parameters = {**self._simulation_parameters(length), "nb_runs":nb_runs, "seed":seed, "common_random_numbers":self.common_random_numbers}
+        return self._cached(solutions, {**parameters, "result":"fitness"}, lambda solutions: self._simulate_fitness(solutions, parameters))[:, 0]
+
+    def evaluate(self, solutions, seed=None, nb_selected=None) -> np.ndarray:
+        """
+        Returns the fitness of each solution, the simulations of a solution only depend on its vector and the seed
+        With racing, only the solutions that can be among the nb_selected best ones get the full evaluation
+        """
+
+        if self.racing_eta > 1 and nb_selected is not None:
+            return self._race(solutions, seed, nb_selected)
+
+        self.is_fully_evaluated = np.ones(len(solutions), dtype=bool)
+        return self._evaluate_rung(solutions, seed, self.nb_run_fitness, self.length_fitness)
+
+    def _rungs(self) -> list:
+        """
+        Returns the (nb_runs, length) of each evaluation of the racing, each one racing_eta times longer and with racing_eta times more runs
+        than the previous one, up to the full evaluation
+        """
+
+        fractions = [self.racing_eta ** (rung - self.racing_rungs + 1) for rung in range(self.racing_rungs)]
+        return [(max(1, round(self.nb_run_fitness * fraction)), max(1, round(self.length_fitness * fraction))) for fraction in fractions]
+
+    def _race(self, solutions, seed, nb_selected:int) -> np.ndarray:
+        """
+        Successive halving: every solution is first evaluated with few short runs, then only the best 1/racing_eta of them
+        (and at least nb_selected) go on to the next evaluation, up to the full one
+        Once no more than nb_selected solutions are left, they go straight to the full evaluation as none of them could be eliminated
+        The remaining solutions get their full fitness, an eliminated solution gets its estimate capped below the ones that went further,
+        so that CMA-ES ranks them last
+        """
+
+        solutions = np.asarray(solutions)
+        rungs = self._rungs()
+
+        fitness = np.zeros(len(solutions))
+        last_rung = np.zeros(len(solutions), dtype=int)
+
+        candidates = np.arange(len(solutions))
+        rung = 0 if len(candidates) > nb_selected else len(rungs) - 1
+        while True:
+            nb_runs, length = rungs[rung]
+            fitness[candidates] = self._evaluate_rung(solutions[candidates], seed, nb_runs, length)
+            last_rung[candidates] = rung
+
+            if rung == len(rungs) - 1:
+                break
+
+            nb_kept = max(nb_selected, int(np.ceil(len(candidates) / self.racing_eta)))
+            candidates = candidates[np.argsort(-fitness[candidates], kind="stable")[:nb_kept]]
+            rung = rung + 1 if len(candidates) > nb_selected else len(rungs) - 1
+
+        self.is_fully_evaluated = last_rung == len(rungs) - 1
+
+        # The estimates of the solutions eliminated at a rung are kept below the fitness of the ones that went further
+        floor = np.inf
+        for rung in reversed(range(len(rungs))):
+            eliminated = last_rung == rung
+            if np.any(eliminated):
+                fitness[eliminated] = np.minimum(fitness[eliminated], np.nextafter(floor, -np.inf))
+                floor = np.min(fitness[eliminated])
+
+        return fitness
+
+    def _run_seed(self, run=0) -> list:
+        """
+        Returns the seed of the simulations of a run, drawn from the process' generator if the evolution is not seeded
+        """
+
+        return [random.randrange(2**32)] if self.seed is None else [self.seed, run]
+
+    def evolve(self, max_generations, genome_to_evolve, state=None, checkpoint=None):
+        """
+        Evolves a genome, given as a Genome or as its vector
+        state holds the CMA-ES state of an interrupted evolution to resume, it is updated at each generation and saved by the checkpoint
+        Returns the best fitness over generations and the solutions of the last generation
+        """
+
+        state = {} if state is None else state
+        state.setdefault("seed", self._run_seed())
+
+        # Progress bar
+        if self.verbose is True:
+            from progress.bar import Bar
+
+            name = "a genome" if isinstance(genome_to_evolve, np.ndarray) else "{} {}".format(genome_to_evolve.name, genome_to_evolve.id+1)
+            bar = Bar("Evolving {} over {} iterations with a map size of {}".format(name, max_generations, self.ring_length), max=max_generations)
+            print("Starting evolution process..", end='\r')
+
+        # CMA-ES, imported when needed as it is slow to import
+        import cma
+
+        if state.get("es") is None:
+            start_solutions = np.array(genome_vector(genome_to_evolve))
+            es = cma.purecma.CMAES(start_solutions, 0.5) if self.population_size is None else cma.purecma.CMAES(start_solutions, 0.5, popsize=self.population_size)
+
+            # Data to register
+            state.update({"es":es, "generation":0, "gen_fitness":[], "solutions":None, "evaluated":[]})
+        else:
+            # A restored CMA-ES samples from a copy of the random generator, it is bound back to the generator of the process
+            state["es"].randn = random.normalvariate
+            if self.verbose is True:
+                bar.goto(state["generation"])
+
+        es = state["es"]
+
+        # MAYBE ISSUE HERE OF IGNORING LAST STEP
+        while not es.stop() and state["generation"] < max_generations:
+            solutions = es.ask()
+            fitness = self.evaluate(solutions, seed=[*state["seed"], 0, state["generation"]], nb_selected=es.params.mu)
+            es.tell(solutions, [-fit for fit in fitness]) # minimization so take opposite of fitness
+
+            state["gen_fitness"].append(np.max(fitness))
+            state["solutions"] = solutions
+            # The capped estimates of the solutions eliminated by the racing are not recorded as fitness
+            if self.record_evaluated is True:
+                recorded_fitness = np.where(self.is_fully_evaluated, fitness, np.nan)
+                state["evaluated"].append((state["generation"], np.asarray(solutions, dtype=np.float32), recorded_fitness))
+            state["generation"] += 1
+
+            if checkpoint is not None and checkpoint.is_due(state["generation"]):
+                checkpoint.save()
+
+            if self.verbose is True:
+                bar.next()
+
+        if self.verbose is True:
+            print()
+        return state["gen_fitness"], state["solutions"]
+
+    def score_each(self, solutions, seed=None) -> np.ndarray:
+        """
+        Runs each solution once for length_score steps, seeded with the given seed
+        Returns the (N_solutions x 3) matrix of the covered distance, entropy and cluster ratio of each solution
+        """
+
+        if self.verbose is True:
+            print("Evaluating generated solutions with the {} backend..".format(self.backend.name))
+
+        parameters = {**self._simulation_parameters(self.length_score), "seed":seed, "common_random_numbers":self.common_random_numbers}
+        simulate = lambda solutions: self.backend.map(score_solution, [(solution, parameters) for solution in solutions])
+
+        return self._cached(solutions, {**parameters, "result":"score"}, simulate)
+
+    def score_solutions(self, solutions, seed=None):
+        """
+        Returns the average covered distance, entropy and cluster ratio over the solutions, each run once for length_score steps
+        """
+
+        covered_distance, entropy, cluster_ratio = np.mean(self.score_each(solutions, seed=seed), axis=0)
+        return covered_distance, entropy, cluster_ratio
+
+    def _campaign_key(self, nb_runs, max_generations) -> dict:
+        """
+        Returns the description of a campaign, a checkpoint can only be resumed by the same campaign
+        The evolved genome is not part of it, a resumed campaign goes on with the genome it was started with
+        """
+
+        return {"nb_runs":nb_runs, "max_generations":max_generations,
+            "length_fitness":self.length_fitness, "length_score":self.length_score, "nb_run_fitness":self.nb_run_fitness,
+            "population_size":self.population_size, "seed":self.seed, "common_random_numbers":self.common_random_numbers,
+            "racing_eta":self.racing_eta, "racing_rungs":self.racing_rungs, **self._simulation_parameters(None)}
+
+    def iterate_evolution(self, nb_runs, max_generations, genome_to_evolve, checkpoint=None, hall_of_fame=None):
+        """
+        Returns the fitness over the generations, and the scores of the evolution process through the desired number of runs
+        With a checkpoint, the campaign is saved as it goes and resumed from the last saved generation
+        With a hall of fame, every evaluated solution is added to it at the end of its run
+        """
+
+        self.record_evaluated = hall_of_fame is not None
+
+        state = {} if checkpoint is None else checkpoint.load(self._campaign_key(nb_runs, max_generations))
+        if "run" in state:
+            if state["run"] < nb_runs:
+                print("Resuming run {}/{} from generation {}".format(state["run"]+1, nb_runs, state["evolution"].get("generation", 0)))
+
+            if not np.array_equal(state["genome"], genome_vector(genome_to_evolve)):
+                genome_to_evolve = state["genome"]
+        else:
+            state.update({"run":0, "evolution":{}, "results":([], [], [], [], []), "solutions":None, "genome":genome_vector(genome_to_evolve)})
+
+        conc_gen_fitness, conc_fitness, conc_distance, conc_entropy, conc_ratio = state["results"]
+        while state["run"] < nb_runs:
+            print("Run {}/{}".format(state["run"]+1, nb_runs))
+            state["evolution"].setdefault("seed", self._run_seed(state["run"]))
+
+            gen_fitness, solutions = self.evolve(max_generations=max_generations, genome_to_evolve=genome_to_evolve, state=state["evolution"], checkpoint=checkpoint)
+            scores = self.score_each(solutions, seed=[*state["evolution"]["seed"], 1])
+            covered_distance, entropy, cluster_ratio = np.mean(scores, axis=0)
+
+            if hall_of_fame is not None:
+                hall_of_fame.add_run(self.ring_length, state["run"], state["evolution"]["evaluated"], scores)
+
+            conc_gen_fitness.append(gen_fitness)
+            conc_fitness.append(np.max(gen_fitness))
+            conc_distance.append(covered_distance)
+            conc_entropy.append(entropy)
+            conc_ratio.append(cluster_ratio)
+
+            state.update({"run":state["run"]+1, "evolution":{}, "solutions":solutions})
+            if checkpoint is not None:
+                checkpoint.save()
+
+        self.solutions = state["solutions"]
+        return conc_gen_fitness, conc_fitness, conc_distance, conc_entropy, conc_ratio
+
+    def run_campaign(self, output_prefix, is_iterated, nb_runs, max_generations, genome_to_evolve, checkpoint=None, results_path=RESULTS_PATH, hall_of_fame=None):
+        """
+        Evolves a genome through the desired number of runs and writes the results, in csv files too unless results_path is None
+        With a checkpoint, an interrupted campaign is resumed and a campaign whose results were written is skipped
+        """
+
+        results = self.iterate_evolution(nb_runs, max_generations, genome_to_evolve, checkpoint=checkpoint, hall_of_fame=hall_of_fame)
+        if checkpoint is not None and checkpoint.state.get("written") is True:
+            print("The results of {} with a map size of {} were already written".format(output_prefix, self.ring_length))
+            return
+
+        metadata = {**self._campaign_key(nb_runs, max_generations), "genome_dim":len(genome_vector(genome_to_evolve))}
+        write_evolution(results_path, output_prefix, self.ring_length, is_iterated, *results, metadata=metadata)
+
+        if checkpoint is not None:
+            checkpoint.state["written"] = True
+            checkpoint.save()
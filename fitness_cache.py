@@ -0,0 +1,121 @@
+import os
+import json
+import sqlite3
+import hashlib
+import numpy as np
+
+from collections import OrderedDict
+
+
+class FitnessCache:
+    """
+    Results of the simulation of genome vectors, by hash of the vector and of the simulation parameters
+    The least recently used results are evicted beyond max_size, with a path they are also kept in a sqlite database shared by the processes
+    """
+
+    def __init__(self, max_size=10000, path=None) -> None:
+        self.max_size = max_size
+        self.path = path
+
+        self.memory = OrderedDict() # key:np.ndarray
+        self.hits = 0
+        self.misses = 0
+
+        self._connection = None
+        self._connection_pid = None
+
+    @staticmethod
+    def key(vector, parameters:dict) -> str:
+        """
+        Returns the key of a genome vector simulated with the given parameters, which include the seed of the simulation
+        The vector is hashed in float32 as the networks' weights are
+        """
+
+        digest = hashlib.sha1(np.ascontiguousarray(vector, dtype=np.float32).tobytes())
+        digest.update(json.dumps(parameters, sort_keys=True).encode())
+
+        return digest.hexdigest()
+
+    def _database(self) -> sqlite3.Connection:
+        """
+        Returns the connection of the process to the database, a forked process opens its own
+        """
+
+        if self._connection is None or self._connection_pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)")
+            self._connection_pid = os.getpid()
+
+        return self._connection
+
+    def _remember(self, key:str, value:np.ndarray) -> None:
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+
+        while len(self.memory) > self.max_size:
+            self.memory.popitem(last=False)
+
+    def get_many(self, keys:list) -> list:
+        """
+        Returns the results of the given keys, None for the unknown ones
+        """
+
+        values = []
+        for key in keys:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+            values.append(self.memory.get(key))
+
+        # The results missing from memory are looked up on disk
+        missing = [key for key, value in zip(keys, values) if value is None]
+        if self.path is not None and len(missing) != 0:
+            stored = {}
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i+500]
+                rows = self._database().execute("SELECT key, value FROM results WHERE key IN ({})".format(",".join("?" * len(chunk))), chunk)
+                stored.update({key:np.frombuffer(value, dtype=float) for key, value in rows})
+
+            for i, key in enumerate(keys):
+                if values[i] is None and key in stored:
+                    values[i] = stored[key]
+                    self._remember(key, stored[key])
+
+        nb_hits = sum(value is not None for value in values)
+        self.hits += nb_hits
+        self.misses += len(keys) - nb_hits
+
+        return values
+
+    def put_many(self, keys:list, values) -> None:
+        """
+        Stores the results of the given keys, each result is an array of floats
+        """
+
+        values = [np.atleast_1d(np.asarray(value, dtype=float)) for value in values]
+        for key, value in zip(keys, values):
+            self._remember(key, value)
+
+        if self.path is not None and len(keys) != 0:
+            with self._database() as database:
+                database.executemany("INSERT OR REPLACE INTO results VALUES (?, ?)", [(key, value.tobytes()) for key, value in zip(keys, values)])
+
+    def __len__(self):
+        return len(self.memory)
+
+
+# Caches of the process, by configuration
+_fitness_caches = {}
+
+
+def get_fitness_cache(max_size=10000, path=None) -> FitnessCache:
+    """
+    Returns the cache of the process with the given configuration, so that it is kept across the tasks given to a worker
+    """
+
+    if (max_size, path) not in _fitness_caches:
+        _fitness_caches[(max_size, path)] = FitnessCache(max_size=max_size, path=path)
+
+    return _fitness_caches[(max_size, path)]
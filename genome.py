@@ -1,4 +1,6 @@
 import torch
+import numpy as np
+
 from copy import deepcopy
 
 from agents import Agent
@@ -22,14 +24,23 @@ class Genome:
 
         self.action_network = ActionNetwork() if action_network is None else deepcopy(action_network)
         self.prediction_network = PredictionNetwork() if prediction_network is None else deepcopy(prediction_network)
+
+        # The weights of both networks are views of a single vector, in the order of to_tensor
+        self.flat_parameters = torch.empty(self.action_network.total_size + self.prediction_network.total_size)
+        self.action_network.flatten_parameters(self.flat_parameters[:self.action_network.total_size])
+        self.prediction_network.flatten_parameters(self.flat_parameters[self.action_network.total_size:])
+
+        # Hidden states of the prediction network, one row per agent in insertion order
+        self.hidden = torch.empty(1, 0, self.prediction_network.hidden_size)
     
     def add_agent(self, **params) -> Agent:
         """
         Adds an agent to the population
         """
 
-        new_agent = Agent(action_network=self.action_network, prediction_network=self.prediction_network, **params)
+        new_agent = Agent(action_network=self.action_network, **params)
         self.agents[new_agent.id] = new_agent
+        self.hidden = torch.cat([self.hidden, self.prediction_network.hn], dim=1)
 
         return new_agent
     
@@ -38,6 +49,9 @@ class Genome:
         Removes a given agent from the population
         """
 
+        index = list(self.agents).index(id)
+        self.hidden = torch.cat([self.hidden[:, :index], self.hidden[:, index+1:]], dim=1)
+
         del self.agents[id]
     
     def compute_fitness(self, length_sim:int) -> None:
@@ -50,20 +64,38 @@ class Genome:
 
         return self.fitness
     
+    def take_decisions(self, nn_input) -> torch.Tensor:
+        """
+        Returns the new direction of every agent given the (N_agents x 5) matrix of their networks' inputs
+        """
+
+        return self.action_network.compute_directions(torch.as_tensor(nn_input))
+
+    def predict_sensors(self, nn_input) -> torch.Tensor:
+        """
+        Returns the predicted sensors of every agent given the (N_agents x 5) matrix of their networks' inputs,
+        advancing the hidden states of all the agents at once
+        """
+
+        nn_output, self.hidden = self.prediction_network.step(torch.as_tensor(nn_input), self.hidden)
+        return torch.round(nn_output)
+
     def to_tensor(self) -> torch.Tensor:
         """
         Compute a tensor representation of the genome
         """
 
-        return torch.cat([self.action_network.to_tensor(), self.prediction_network.to_tensor()])
+        return self.flat_parameters.clone()
 
-    def from_tensor(self, tensor_genome:torch.Tensor):
+    def from_tensor(self, tensor_genome):
         """
-        Changes the genome's parameters according to a given tensor
+        Changes the genome's parameters according to a given tensor or array-like, with a single copy into the genome's vector
         """
 
-        self.action_network.from_tensor(tensor_genome[:self.action_network.total_size])
-        self.prediction_network.from_tensor(tensor_genome[self.action_network.total_size:])
+        if isinstance(tensor_genome, torch.Tensor):
+            self.flat_parameters.copy_(tensor_genome)
+        else:
+            self.flat_parameters.numpy()[:] = np.asarray(tensor_genome, dtype=np.float32)
 
         return self
-    
+
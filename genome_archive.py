@@ -0,0 +1,210 @@
+import os
+import pickle
+import argparse
+import numpy as np
+
+
+GENOME_MAGIC = b"GENM"
+GENOME_VERSION = 1
+
+# Header of a genome file or archive, the network sizes are (input_size, hidden_size, output_size)
+GENOME_HEADER = np.dtype([("magic", "S4"), ("version", "<u2"), ("action_network", "<u2", (3,)), ("prediction_network", "<u2", (3,)),
+    ("nb_weights", "<u4"), ("hidden_size", "<u4")])
+
+
+def _make_header(action_network, prediction_network) -> np.ndarray:
+    """
+    Returns the header describing genomes with the given networks' sizes
+    """
+
+    header = np.zeros(1, dtype=GENOME_HEADER)
+    header["magic"] = GENOME_MAGIC
+    header["version"] = GENOME_VERSION
+    header["action_network"] = (action_network.input_size, action_network.hidden_size, action_network.output_size)
+    header["prediction_network"] = (prediction_network.input_size, prediction_network.hidden_size, prediction_network.output_size)
+    header["nb_weights"] = action_network.total_size + prediction_network.total_size
+    header["hidden_size"] = prediction_network.hn.numel()
+
+    return header
+
+
+def _read_header(f) -> np.ndarray:
+    header = np.frombuffer(f.read(GENOME_HEADER.itemsize), dtype=GENOME_HEADER)
+    if len(header) != 1 or header["magic"][0] != GENOME_MAGIC:
+        raise ValueError("{} is not a genome file".format(f.name))
+    if header["version"][0] > GENOME_VERSION:
+        raise ValueError("{} was written by a newer version (format {})".format(f.name, header["version"][0]))
+
+    return header
+
+
+def _record_size(header:np.ndarray) -> int:
+    return int(header["nb_weights"][0] + header["hidden_size"][0])
+
+
+def _to_record(action_network, prediction_network) -> np.ndarray:
+    """
+    Returns the float32 record of a genome: the flattened weights of both networks, then the initial hidden state
+    """
+
+    parameters = [*action_network.to_numpy(), *prediction_network.to_numpy(), prediction_network.hn.numpy()]
+    return np.concatenate([parameter.ravel() for parameter in parameters]).astype(np.float32)
+
+
+def _from_record(header:np.ndarray, record:np.ndarray) -> dict:
+    """
+    Returns the networks of a genome record, as the parameters of a Genome
+    """
+
+    # The networks need torch, which is only imported when a genome is loaded
+    import torch
+    from neural_network import ActionNetwork, PredictionNetwork
+
+    action_network = ActionNetwork(*header["action_network"][0].tolist())
+    prediction_network = PredictionNetwork(*header["prediction_network"][0].tolist())
+
+    action_network.from_tensor(record[:action_network.total_size])
+    prediction_network.from_tensor(record[action_network.total_size:action_network.total_size + prediction_network.total_size])
+    prediction_network.hn = torch.tensor(record[action_network.total_size + prediction_network.total_size:]).reshape(1, 1, -1)
+
+    return {"action_network":action_network, "prediction_network":prediction_network}
+
+
+def write_genome(path:str, action_network, prediction_network) -> None:
+    """
+    Saves a genome in the compact format: a header with the networks' sizes followed by its float32 record
+    """
+
+    with open(path, "wb") as f:
+        f.write(_make_header(action_network, prediction_network).tobytes())
+        f.write(_to_record(action_network, prediction_network).tobytes())
+
+
+def read_genome(path:str) -> dict:
+    """
+    Loads a genome saved in the compact format or pickled by previous versions, as the parameters of a Genome
+    """
+
+    if path.endswith(".pkl"):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    return _from_record(*_read_record(path))
+
+
+def _read_record(path:str):
+    """
+    Returns the header and the record of a genome file in the compact format
+    """
+
+    with open(path, "rb") as f:
+        header = _read_header(f)
+        record = np.frombuffer(f.read(), dtype=np.float32)
+
+    if len(record) != _record_size(header):
+        raise ValueError("{} is truncated".format(path))
+
+    return header, record
+
+
+def read_genome_vector(path:str) -> np.ndarray:
+    """
+    Returns the flattened weights of a saved genome, as given by Genome.to_tensor, a genome in the compact format is read without torch
+    """
+
+    if path.endswith(".pkl"):
+        genome = read_genome(path)
+        return np.concatenate([genome["action_network"].to_tensor().numpy(), genome["prediction_network"].to_tensor().numpy()])
+
+    header, record = _read_record(path)
+    return np.array(record[:int(header["nb_weights"][0])])
+
+
+class GenomeArchive:
+    """
+    Many genomes with the same network sizes stored in a single file, one float32 record after the header per genome
+    The records are memory-mapped, so a genome is only read when it is loaded
+    """
+
+    def __init__(self, path:str) -> None:
+        self.path = path
+
+        self.header = None
+        self._records = None
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                self.header = _read_header(f)
+
+    def __len__(self):
+        if self.header is None:
+            return 0
+
+        return (os.path.getsize(self.path) - GENOME_HEADER.itemsize) // (4 * _record_size(self.header))
+
+    def records(self) -> np.ndarray:
+        """
+        Returns the read-only (N_genomes x record_size) matrix of the records, mapped from the file
+        """
+
+        if len(self) == 0:
+            return np.empty((0, 0 if self.header is None else _record_size(self.header)), dtype=np.float32)
+
+        if self._records is None or len(self._records) != len(self):
+            self._records = np.memmap(self.path, dtype=np.float32, mode="r", offset=GENOME_HEADER.itemsize, shape=(len(self), _record_size(self.header)))
+
+        return self._records
+
+    def vectors(self) -> np.ndarray:
+        """
+        Returns the flattened weights of every genome without their hidden state, as given by Genome.to_tensor
+        """
+
+        return self.records()[:, :int(self.header["nb_weights"][0])]
+
+    def __getitem__(self, index:int) -> dict:
+        """
+        Loads a genome, as the parameters of a Genome
+        """
+
+        return _from_record(self.header, self.records()[index])
+
+    def extend(self, genomes) -> None:
+        """
+        Appends genomes given as the parameters of a Genome, or as objects with action_network and prediction_network attributes
+        """
+
+        genomes = [genome if isinstance(genome, dict) else {"action_network":genome.action_network, "prediction_network":genome.prediction_network} for genome in genomes]
+        if len(genomes) == 0:
+            return
+
+        header = _make_header(genomes[0]["action_network"], genomes[0]["prediction_network"])
+        if self.header is not None and header.tobytes() != self.header.tobytes():
+            raise ValueError("The genomes' network sizes do not match the ones of {}".format(self.path))
+
+        records = np.stack([_to_record(genome["action_network"], genome["prediction_network"]) for genome in genomes])
+
+        with open(self.path, "ab") as f:
+            if self.header is None:
+                f.write(header.tobytes())
+                self.header = header
+            f.write(records.tobytes())
+
+    def append(self, action_network, prediction_network) -> None:
+        self.extend([{"action_network":action_network, "prediction_network":prediction_network}])
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Appends genomes (.gen or pickled .pkl files) to a genome archive")
+
+    parser.add_argument("archive", help="Path to the archive, created if needed")
+    parser.add_argument("genomes", nargs="+", help="Genome files to append")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    archive = GenomeArchive(args.archive)
+    archive.extend([read_genome(path) for path in args.genomes])
+    print("{} genomes in {}".format(len(archive), args.archive))
@@ -0,0 +1,167 @@
+import os
+import json
+import numpy as np
+
+
+HALL_OF_FAME_PATH = "Results/{}_hall_of_fame" # prefix
+
+# Description of each evaluated genome, the metrics are only known for the scored last generation of a run (nan otherwise)
+HALL_OF_FAME_ENTRY = np.dtype([("fitness", "<f8"), ("length", "<u4"), ("run", "<u4"), ("generation", "<u4"),
+    ("distance", "<f8"), ("entropy", "<f8"), ("ratio", "<f8")])
+
+
+class HallOfFame:
+    """
+    Every genome vector evaluated during evolution campaigns, with its fitness, map size, run, generation and metrics
+    The vectors and entries are appended to memory-mapped files, an index of the entries sorted by fitness answers top-k and range queries
+    """
+
+    def __init__(self, path:str) -> None:
+        self.path = path
+
+        self.entries_path = os.path.join(path, "entries.bin")
+        self.vectors_path = os.path.join(path, "vectors.bin")
+        self.index_path = os.path.join(path, "index.npy")
+
+        self.genome_dim = None
+        if os.path.exists(os.path.join(path, "meta.json")):
+            with open(os.path.join(path, "meta.json"), 'r') as f:
+                self.genome_dim = json.load(f)["genome_dim"]
+
+        self._index = None
+
+    def __len__(self):
+        if not os.path.exists(self.entries_path):
+            return 0
+
+        return os.path.getsize(self.entries_path) // HALL_OF_FAME_ENTRY.itemsize
+
+    def add(self, vectors, fitness, length:int, run:int, generation, distance=np.nan, entropy=np.nan, ratio=np.nan) -> None:
+        """
+        Appends a number of evaluated genome vectors, the other arguments are scalars or one value per vector
+        """
+
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if len(vectors) == 0:
+            return
+
+        if self.genome_dim is None:
+            os.makedirs(self.path, exist_ok=True)
+            self.genome_dim = vectors.shape[1]
+            with open(os.path.join(self.path, "meta.json"), 'w') as f:
+                json.dump({"genome_dim":self.genome_dim}, f)
+        elif vectors.shape[1] != self.genome_dim:
+            raise ValueError("The genomes have {} weights instead of the {} of {}".format(vectors.shape[1], self.genome_dim, self.path))
+
+        entries = np.zeros(len(vectors), dtype=HALL_OF_FAME_ENTRY)
+        for name, values in zip(HALL_OF_FAME_ENTRY.names, [fitness, length, run, generation, distance, entropy, ratio]):
+            entries[name] = values
+
+        # The entries are written last, the number of entries is the number of complete genomes
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+        with open(self.entries_path, "ab") as f:
+            f.write(entries.tobytes())
+
+    def add_run(self, length:int, run:int, evaluated:list, scores=None) -> None:
+        """
+        Appends the genomes evaluated during a run, given as (generation, solutions, fitness) tuples
+        scores are the covered distance, entropy and cluster ratio of each solution of the last generation
+        The solutions without a fitness (nan), eliminated by the racing before their full evaluation, are left out
+        """
+
+        for i, (generation, solutions, fitness) in enumerate(evaluated):
+            is_known = ~np.isnan(np.asarray(fitness, dtype=float))
+            solutions, fitness = np.asarray(solutions)[is_known], np.asarray(fitness)[is_known]
+
+            if scores is not None and i == len(evaluated) - 1:
+                known_scores = np.asarray(scores)[is_known]
+                self.add(solutions, fitness, length, run, generation, distance=known_scores[:, 0], entropy=known_scores[:, 1], ratio=known_scores[:, 2])
+            else:
+                self.add(solutions, fitness, length, run, generation)
+
+    def entries(self) -> np.ndarray:
+        """
+        Returns the entries of every genome, mapped from the file
+        """
+
+        if len(self) == 0:
+            return np.empty(0, dtype=HALL_OF_FAME_ENTRY)
+
+        return np.memmap(self.entries_path, dtype=HALL_OF_FAME_ENTRY, mode="r", shape=(len(self),))
+
+    def vectors(self, indices=None) -> np.ndarray:
+        """
+        Returns the genome vectors of the given indices, all of them mapped from the file by default
+        """
+
+        if len(self) == 0:
+            return np.empty((0, 0 if self.genome_dim is None else self.genome_dim), dtype=np.float32)
+
+        vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self), self.genome_dim))
+        return vectors if indices is None else np.asarray(vectors[indices])
+
+    def index(self) -> np.ndarray:
+        """
+        Returns the indices of the entries sorted by increasing fitness
+        The saved index is completed with the entries added since it was built, by merging them in
+        """
+
+        nb_entries = len(self)
+
+        if self._index is None and os.path.exists(self.index_path):
+            self._index = np.load(self.index_path)
+        if self._index is None:
+            self._index = np.empty(0, dtype=np.int64)
+
+        if len(self._index) != nb_entries:
+            fitness = np.asarray(self.entries()["fitness"])
+
+            new_indices = np.arange(len(self._index), nb_entries)
+            new_indices = new_indices[np.argsort(fitness[new_indices], kind="stable")]
+
+            positions = np.searchsorted(fitness[self._index], fitness[new_indices], side="right")
+            self._index = np.insert(self._index, positions, new_indices)
+
+            np.save(self.index_path, self._index)
+
+        return self._index
+
+    def select(self, min_fitness=-np.inf, max_fitness=np.inf, lengths=None, runs=None, generations=None) -> np.ndarray:
+        """
+        Returns the indices of the genomes whose fitness lies within [min_fitness, max_fitness] and matching the given filters,
+        by decreasing fitness
+        """
+
+        index = self.index()
+        fitness = np.asarray(self.entries()["fitness"])[index]
+
+        # The fitness range is a slice of the sorted index
+        start, end = np.searchsorted(fitness, min_fitness, side="left"), np.searchsorted(fitness, max_fitness, side="right")
+        selected = index[start:end][::-1]
+
+        entries = np.asarray(self.entries()[selected])
+        mask = np.ones(len(selected), dtype=bool)
+        for name, values in [("length", lengths), ("run", runs), ("generation", generations)]:
+            if values is not None:
+                mask &= np.isin(entries[name], values)
+
+        return selected[mask]
+
+    def top(self, k=10, **filters) -> np.ndarray:
+        """
+        Returns the indices of the k best genomes matching the filters of select, by decreasing fitness
+        """
+
+        return self.select(**filters)[:k]
+
+    def best_vector(self, **filters) -> np.ndarray:
+        """
+        Returns the vector of the best genome matching the filters of select, to warm-start an evolution
+        """
+
+        best = self.top(1, **filters)
+        if len(best) == 0:
+            raise ValueError("No genome of {} matches {}".format(self.path, filters))
+
+        return self.vectors(best)[0]
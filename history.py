@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class PositionHistory:
+    """
+    The last positions of a swarm's agents, stored in a preallocated ring buffer of shape (..., N_agents, horizon)
+    Each position is written twice, horizon apart, so that the recorded positions always form a contiguous view
+    """
+
+    default_capacity = 64
+
+    def __init__(self, nb_agents:int, horizon:int=None, batch_shape=()) -> None:
+        """
+        horizon is the number of positions kept, all of them are kept if None
+        """
+
+        self.shape = (*batch_shape, nb_agents)
+        self.horizon = horizon
+
+        self._allocate(self.default_capacity if horizon is None else horizon)
+
+    def _allocate(self, capacity:int) -> None:
+        """
+        Allocates an empty buffer for a given number of positions
+        """
+
+        self.capacity = capacity
+        self.buffer = np.empty((*self.shape, 2 * capacity), dtype=float)
+
+        self.start = 0 # Index of the oldest position
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self) -> None:
+        """
+        Forgets all the recorded positions
+        """
+
+        self.start = 0
+        self.size = 0
+
+    def set_horizon(self, horizon:int=None) -> None:
+        """
+        Changes the number of positions kept, keeping the most recent ones
+        """
+
+        if horizon == self.horizon:
+            return
+
+        positions = self.view()
+        if horizon is not None:
+            positions = positions[..., max(0, self.size - horizon):]
+
+        self.horizon = horizon
+        self._reload(positions.copy(), self.default_capacity if horizon is None else horizon)
+
+    def append(self, positions:np.ndarray) -> None:
+        """
+        Records the agents' positions, in constant time
+        """
+
+        if self.size == self.capacity:
+            if self.horizon is None:
+                self._reload(self.view().copy(), 2 * self.capacity)
+            else:
+                self.start = (self.start + 1) % self.capacity
+                self.size -= 1
+
+        end = (self.start + self.size) % self.capacity
+        self.buffer[..., end] = positions
+        self.buffer[..., end + self.capacity] = positions
+
+        self.size += 1
+
+    def _reload(self, positions:np.ndarray, capacity:int) -> None:
+        """
+        Allocates a new buffer holding the given positions of shape (..., N_agents, length)
+        """
+
+        size = positions.shape[-1]
+        self._allocate(max(capacity, size))
+
+        self.buffer[..., :size] = positions
+        self.buffer[..., self.capacity:self.capacity + size] = positions
+        self.size = size
+
+    def view(self) -> np.ndarray:
+        """
+        Returns the recorded positions of shape (..., N_agents, length), from the oldest to the most recent, without copy
+        """
+
+        return self.buffer[..., self.start:self.start + self.size]
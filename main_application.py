@@ -1,22 +1,20 @@
-import cma
-import csv
-import torch
 import numpy as np
 import tkinter as tk
 
-from scoop import futures
-from progress.bar import Bar
-
 
 from genome import Genome
+from fitness_cache import FitnessCache
+from evolution import Evolution
+from checkpoint import Checkpoint, CHECKPOINT_PATH
+from backends import make_backend
 from map_ring import Ring
+from map_ring_vectorized import VectorizedRing
 
 from menu_play import PlayMenu
 from menu_genome import GenomeMenu
 from menu_show import ShowMenu
 
 from neural_network import ActionNetwork, PredictionNetwork
-from utils import entropy, get_time_stamp
 
 
 class MainApplication(tk.Frame):
@@ -34,7 +32,7 @@ class MainApplication(tk.Frame):
     default_max_generations = 30
     default_history_length = 500
     
-    def __init__(self, master, ring_length=25, simulation_speed=1, length_fitness=100, length_score=500, nb_run_fitness=1, nb_genomes=1, nb_agents=20, agent_param={"sensor_range_0":.5, "sensor_range_1":1.0, "speed":.1, "noise":.01}):
+    def __init__(self, master, ring_length=25, simulation_speed=1, length_fitness=100, length_score=500, nb_run_fitness=1, nb_genomes=1, nb_agents=20, agent_param={"sensor_range_0":.5, "sensor_range_1":1.0, "speed":.1, "noise":.01}, vectorized=True, backend="serial", fitness_cache_size=10000):
         super().__init__(master)
         self.master.resizable(False, False)
         
@@ -49,7 +47,9 @@ class MainApplication(tk.Frame):
         self.nb_agents = nb_agents
         self.agent_param = agent_param
 
-        self.map = Ring(ring_length=ring_length)
+        self.backend = make_backend(backend)
+        self.fitness_cache = FitnessCache(max_size=fitness_cache_size) if fitness_cache_size > 0 else None
+        self.map = (VectorizedRing if vectorized is True else Ring)(ring_length=ring_length)
 
         self.genomes = []
         self.id_to_genome = {}
@@ -107,8 +107,8 @@ class MainApplication(tk.Frame):
         self.id_to_genome[new_genome.id] = new_genome
 
         for _ in range(self.nb_agents):
-            new_agent = new_genome.add_agent(**self.agent_param)
-            self.map.add_agent(new_genome.id, new_agent)
+            new_genome.add_agent(**self.agent_param)
+        self.map.add_genome(new_genome)
         
         if name is not None or name == "":
             new_genome.name = name
@@ -153,66 +153,19 @@ class MainApplication(tk.Frame):
     
     def _compute_genome_fitness(self, genome_tensor):
         """
-        Return the average a genome's fitness over a number of runs (slow)
+        Return the average a genome's fitness over a number of runs, simulated together, a genome already simulated is not simulated again
         """
         
-        genome = Genome().from_tensor(torch.Tensor(genome_tensor))
-        self._load_genome(new_genome=genome)
-
-        reward = 0
-        for _ in range(self.nb_run_fitness):
-            self.map.reset(genome_to_reset=genome.id)
-            self.map.run(length=self.length_fitness, genome_to_run=genome.id)
-            reward += genome.compute_fitness(self.length_fitness)
-        
-        return reward / self.nb_run_fitness
-
-    def _compute_covered_distance(self, genome):
-        """
-        Computes the covered distance by the genome, assuming all agents have the same speed
-        """
-
-        agents = list(genome.agents.values())
-        tau = 0.5 * self.map.ring_length / agents[0].speed
+        return self._make_evolution().evaluate([np.asarray(genome_tensor)])[0]
 
-        return sum(abs(agent.position - agent.position_history[-int(tau)]) for agent in agents) / (len(agents) * tau)
-    
-    def _compute_entropy(self, genome):
+    def _make_evolution(self):
         """
-        Computes the average entropy of the genome's agents' sensors
+        Returns the evolution process matching the application's current parameters
         """
 
-        agents = list(genome.agents.values())
-
-        avg_entropy = 0
-        for agent in agents:
-            ent_0 = sum(map(entropy, [count / self.map.length_sim for count in agent.sensor_0_activation_count]))
-            ent_1 = sum(map(entropy, [count / self.map.length_sim for count in agent.sensor_1_activation_count]))
-            
-            avg_entropy += ent_0 + ent_1
-        
-        return avg_entropy / (4 * len(agents))
-    
-    def _compute_largest_cluster_ratio(self, genome):
-        """
-        Computes the ratio of swarm in the largest cluster
-        """
+        return Evolution(ring_length=self.map.ring_length, length_fitness=self.length_fitness, length_score=self.length_score,
+            nb_run_fitness=self.nb_run_fitness, nb_agents=self.nb_agents, agent_param=self.agent_param, backend=self.backend, fitness_cache=self.fitness_cache)
 
-        agents = sorted(list(genome.agents.values()), key=lambda x: x.position)
-
-        cluster_sizes = [1]
-        for i, agent in enumerate(agents):
-            if abs(agent.position - agents[(i+1)%len(agents)].position) <= agent.sensor_range_1:
-                if i+1 != len(agents):
-                    cluster_sizes[-1] += 1
-                else:
-                    cluster_sizes[-1] += cluster_sizes[0]
-                    cluster_sizes[0] = cluster_sizes[-1]
-            else:
-                cluster_sizes.append(1)
-        
-        return max(cluster_sizes) / len(agents)
-        
     @_pause_during_execution
     def evolve(self, max_generations, genome_to_evolve, replace_population=True):
         """
@@ -220,59 +173,52 @@ class MainApplication(tk.Frame):
         Returns the best fitness over generations, covered distance, entropy and cluster ratio of the last generation
         """
 
-        # Progress bar
-        bar = Bar("Evolving {} {} over {} iterations with a map size of {}".format(genome_to_evolve.name, genome_to_evolve.id+1, max_generations, self.map.ring_length), max=max_generations)
-        print("Starting evolution process..", end='\r')
+        evolution = self._make_evolution()
+        gen_fitness, solutions = evolution.evolve(max_generations=max_generations, genome_to_evolve=genome_to_evolve)
 
-        # CMA-ES
-        start_solutions = np.array(genome_to_evolve.to_tensor())        
-        es = cma.purecma.CMAES(start_solutions, 0.5)
+        if replace_population is True:
+            self._delete_genomes()
 
-        # Data to register
-        gen_fitness = []
+        # Computing the average of the scores over the population
+        covered_distance, entropy, cluster_ratio = evolution.score_solutions(solutions)
 
-        # MAYBE ISSUE HERE OF IGNORING LAST STEP
-        i = 0
-        while not es.stop() and i < max_generations:
-            solutions = es.ask()
-            fitness = list(futures.map(self._compute_population_fitness, solutions))
-            es.tell(solutions, [-fit for fit in fitness]) # minimization so take opposite of fitness
+        self._add_solutions(solutions)
 
-            gen_fitness.append(np.max(fitness))
+        return gen_fitness, covered_distance, entropy, cluster_ratio
 
-            bar.next()
-            i += 1
+    @_pause_during_execution
+    def run_campaign(self, output_prefix, is_iterated, nb_runs, max_generations, genome_to_evolve):
+        """
+        Evolves a genome through a number of runs on the current map size and writes the results, the population is replaced by the last run's solutions
+        The campaign is saved at each generation, starting it again with the same output prefix resumes it
+        """
 
-        if replace_population is True:
-            for gen in self.genomes:
-                self.genome_menu.delete_genome(gen.id)
-        
-        # Progress bar
-        print()
-        bar = Bar("Evaluating generated solutions", max=len(solutions))
-        print("Starting evaluation of generated solutions..", end='\r')
+        evolution = self._make_evolution()
+        checkpoint = Checkpoint(CHECKPOINT_PATH.format(output_prefix, self.map.ring_length))
+        evolution.run_campaign(output_prefix, is_iterated, nb_runs, max_generations, genome_to_evolve, checkpoint=checkpoint)
 
-        # Adding the generated genomes to the menu and computing the average of the scores over the population
-        covered_distance, entropy, cluster_ratio = 0, 0, 0
-        action_network, prediction_network = ActionNetwork(), PredictionNetwork()
-        for gen_tensor in solutions:
-            action_network.from_tensor(torch.Tensor(gen_tensor[:action_network.total_size]))
-            prediction_network.from_tensor(torch.Tensor(gen_tensor[action_network.total_size:]))
-            
-            genome = self.genome_menu.add_genome(parameters={"action_network":action_network, "prediction_network":prediction_network})
+        self._delete_genomes()
+        self._add_solutions(evolution.solutions)
 
-            # Running the genome to compute the scores
-            self.map.reset(genome_to_reset=genome.id)
-            self.map.run(length=self.length_score, genome_to_run=genome.id)
+    def _delete_genomes(self):
+        """
+        Removes every genome from the application
+        """
 
-            covered_distance += self._compute_covered_distance(genome)
-            entropy += self._compute_entropy(genome)
-            cluster_ratio += self._compute_largest_cluster_ratio(genome)
+        for gen in self.genomes:
+            self.genome_menu.delete_genome(gen.id)
 
-            bar.next()
+    def _add_solutions(self, solutions):
+        """
+        Adds the genomes of the given vectors to the menu
+        """
 
-        print()
-        return gen_fitness, covered_distance / len(solutions), entropy / len(solutions), cluster_ratio / len(solutions)
+        action_network, prediction_network = ActionNetwork(), PredictionNetwork()
+        for gen_tensor in solutions:
+            action_network.from_tensor(gen_tensor[:action_network.total_size])
+            prediction_network.from_tensor(gen_tensor[action_network.total_size:])
+            
+            self.genome_menu.add_genome(parameters={"action_network":action_network, "prediction_network":prediction_network})
 
     def run(self):
         """
@@ -0,0 +1,89 @@
+import os
+import argparse
+
+from genome_archive import read_genome_vector
+from hall_of_fame import HallOfFame, HALL_OF_FAME_PATH
+from fitness_cache import get_fitness_cache
+from backends import BACKENDS, make_backend
+from evolution import Evolution, RESULTS_PATH, load_parameters
+from checkpoint import Checkpoint, CHECKPOINT_PATH, seed_rng
+from campaign import Campaign
+from utils import get_time_stamp
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Evolves genomes without the graphical interface, the parameters are read from a json file")
+
+    parser.add_argument("--parameters", default="parameters.json", help="Path to the parameters file (default is parameters.json)")
+    parser.add_argument("--output_prefix", default="", help="Name prefix of the output (default is timestamp)")
+    parser.add_argument("--nb_runs", type=int, default=200, help="Number of runs (default 200)")
+    parser.add_argument("--max_generations", type=int, default=None, help="Maximum number of generations (default is nb_generations from the parameters)")
+    parser.add_argument("--ring_length", type=int, default=None, help="Evolve on a single ring length instead of every length of the parameters' range")
+    parser.add_argument("--length_step", type=int, default=5, help="Step between the evolved ring lengths (default 5)")
+    parser.add_argument("--length_score", type=int, default=500, help="Length of the runs scoring the last generation (default 500)")
+    parser.add_argument("--backend", default="process", choices=list(BACKENDS), help="Evaluation backend (default process, scoop requires python -m scoop)")
+    parser.add_argument("--nb_workers", type=int, default=None, help="Number of worker processes (default is the number of cores)")
+    parser.add_argument("--genome", default=None, help="Genome file (.gen or pickled .pkl) to evolve, or a hall of fame to start from its best genome (default is a random genome)")
+    parser.add_argument("--schedule", default="runs", choices=["runs", "generations"], help="Spread the independent (ring length, run) tasks over the workers, or the genomes of each generation (default runs)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the campaign, its simulations are reproducible (default is random)")
+    parser.add_argument("--common_random_numbers", action="store_true", help="Simulate every genome of a generation from the same initial configurations and noise, overrides the parameters")
+    parser.add_argument("--racing_eta", type=int, default=None, help="Race the genomes of each generation with successive halving, keeping 1/racing_eta of them at each rung, overrides the parameters")
+    parser.add_argument("--hall_of_fame", action="store_true", help="Record every evaluated genome in Results/{prefix}_hall_of_fame")
+    parser.add_argument("--cache_size", type=int, default=0, help="Number of fitness kept in memory by each process to avoid simulating a genome twice, 0 disables the cache (default 0)")
+    parser.add_argument("--cache_path", default=None, help="Sqlite database keeping the cached fitness on disk, shared by the workers (default is memory only)")
+    parser.add_argument("--no_csv", action="store_true", help="Only write the results in the results store, without the csv files")
+    parser.add_argument("--checkpoint_every", type=int, default=1, help="Generations between checkpoints, 0 disables them (default 1), run again with the same output prefix to resume")
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    parameters = load_parameters(args.parameters)
+    if args.common_random_numbers is True:
+        parameters["evolution"]["common_random_numbers"] = True
+    if args.racing_eta is not None:
+        parameters["evolution"]["racing_eta"] = args.racing_eta
+
+    max_generations = parameters["evolution"]["nb_generations"] if args.max_generations is None else args.max_generations
+    output_prefix = get_time_stamp() if args.output_prefix == "" else args.output_prefix
+
+    # The genome is evolved as a vector, torch is only imported to create a random genome
+    if args.genome is None:
+        from genome import Genome
+        genome_to_evolve = Genome()
+    elif os.path.isdir(args.genome):
+        genome_to_evolve = HallOfFame(args.genome).best_vector()
+    else:
+        genome_to_evolve = read_genome_vector(args.genome)
+
+    if args.ring_length is None:
+        min_length, max_length = parameters["map"]["ring_length"]
+        lengths, is_iterated = list(range(min_length, max_length+1, args.length_step)), True
+    else:
+        lengths, is_iterated = [args.ring_length], False
+
+    results_path = None if args.no_csv is True else RESULTS_PATH
+    hall_of_fame = HallOfFame(HALL_OF_FAME_PATH.format(output_prefix)) if args.hall_of_fame is True else None
+    fitness_cache = {"max_size":args.cache_size, "path":args.cache_path} if args.cache_size > 0 else None
+
+    with make_backend(args.backend, nb_workers=args.nb_workers) as backend:
+        if args.schedule == "runs":
+            campaign = Campaign(parameters, lengths, args.nb_runs, max_generations, genome_to_evolve, output_prefix, is_iterated=is_iterated,
+                length_score=args.length_score, seed=args.seed, checkpoint_every=args.checkpoint_every, results_path=results_path, hall_of_fame=hall_of_fame, fitness_cache=fitness_cache)
+            campaign.run(backend)
+        else:
+            # CMA-ES samples from the generator of the process
+            if args.seed is not None:
+                seed_rng(args.seed)
+
+            for length in lengths:
+                evolution = Evolution.from_parameters(parameters, ring_length=length, length_score=args.length_score, backend=backend,
+                    fitness_cache=None if fitness_cache is None else get_fitness_cache(**fitness_cache), seed=args.seed)
+                checkpoint = Checkpoint(CHECKPOINT_PATH.format(output_prefix, length), every=args.checkpoint_every) if args.checkpoint_every > 0 else None
+
+                evolution.run_campaign(output_prefix, is_iterated, args.nb_runs, max_generations, genome_to_evolve, checkpoint=checkpoint, results_path=results_path, hall_of_fame=hall_of_fame)
+
+
+if __name__ == "__main__":
+    main()
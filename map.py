@@ -1,16 +1,24 @@
-from progress.bar import Bar
+import numpy as np
 
-from utils import *
 from agents import Agent
+from history import PositionHistory
 
 class Map:
     """
     The map containing the agents
     """
 
-    def __init__(self) -> None:
+    def __init__(self, seed=None) -> None:
+        """
+        The agents' initial states and noise are drawn from the map's generator, seeded with the given seed
+        """
+
+        self.rng = np.random.default_rng(seed)
+
+        self.genomes = {} # genome's id:Genome
         self.agents = {} # genome's id:Agent
         self.agent_to_pos = {} # genome's id:{Agent:pos}
+        self.histories = {} # genome's id:PositionHistory
 
         self.genome_to_show = 0 # id of genome to show
 
@@ -33,13 +41,49 @@ class Map:
 
         raise NotImplementedError("Overriden by other topologies")
     
-    def _detect_others(self, agent:Agent, pos_to_agent:dict):
+    def _detect_others(self, agents:list):
         """
-        Updates the agent's sensor based on the others' positions
+        Updates the agents' sensors based on the others' positions
         """
 
         raise NotImplementedError("Overriden by other topologies")
     
+    def _state_key(self, genome_id:int) -> bytes:
+        """
+        Returns the joint state of a genome's agents, which determines all of their next steps, or None if their steps are random
+        """
+
+        return None
+
+    def _counters(self, genome_id:int) -> np.ndarray:
+        """
+        Returns the (N_agents x 5) matrix of the score and the 4 activation counts of a genome's agents
+        """
+
+        return np.array([[agent.score, *agent.sensor_0_activation_count, *agent.sensor_1_activation_count] for agent in self.agents[genome_id]])
+
+    def _add_counters(self, genome_id:int, counters:np.ndarray) -> None:
+        """
+        Adds a (N_agents x 5) matrix to the scores and activation counts of a genome's agents
+        """
+
+        for agent, agent_counters in zip(self.agents[genome_id], counters.tolist()):
+            agent.score += agent_counters[0]
+            agent.sensor_0_activation_count = [count + added for count, added in zip(agent.sensor_0_activation_count, agent_counters[1:3])]
+            agent.sensor_1_activation_count = [count + added for count, added in zip(agent.sensor_1_activation_count, agent_counters[3:5])]
+
+    def _repeat_history(self, genome_id:int, period:int, nb_cycles:int) -> None:
+        """
+        Appends the last period positions of a genome's history a number of times
+        """
+
+        history = self.get_history(genome_id)
+        cycle = history.view()[..., -period:].copy()
+
+        for _ in range(nb_cycles):
+            for i in range(period):
+                history.append(cycle[..., i])
+
     def show_console(self):
         """
         Outputs the map in the console
@@ -61,10 +105,50 @@ class Map:
         if new_agent not in self.agents[genome_id]:
             self.agents[genome_id].append(new_agent)
 
+            new_agent.direction = int(self.rng.choice([-1, 1]))
             new_position = self._init_agent_position(new_agent)
             self.agent_to_pos[genome_id][new_agent] = new_position
             new_agent.position = new_position
 
+    def add_genome(self, genome):
+        """
+        Add a genome and all of its agents to the map
+        """
+
+        self.genomes[genome.id] = genome
+        for agent in genome.agents.values():
+            self.add_agent(genome.id, agent)
+
+    def remove_genome(self, genome_id:int):
+        """
+        Removes all of a genome's agents from the map
+        """
+
+        del self.genomes[genome_id]
+        del self.agents[genome_id]
+        del self.agent_to_pos[genome_id]
+        self.histories.pop(genome_id, None)
+
+    def get_history(self, genome_id:int) -> PositionHistory:
+        """
+        Returns the position history of a genome's agents, one row per agent
+        """
+
+        nb_agents = len(self.agents[genome_id])
+        if genome_id not in self.histories or self.histories[genome_id].shape[-1] != nb_agents:
+            self.histories[genome_id] = PositionHistory(nb_agents)
+
+        return self.histories[genome_id]
+
+    def _record_positions(self, genome_id:int, max_record_hoziron=0):
+        """
+        Adds the agents' positions to their genome's history, keeping at most max_record_hoziron + 1 positions (0 keeps everything)
+        """
+
+        history = self.get_history(genome_id)
+        history.set_horizon(None if max_record_hoziron == 0 else max_record_hoziron + 1)
+        history.append([agent.position for agent in self.agents[genome_id]])
+
     def _step(self, genome_id, max_record_hoziron=0):
         """
         Run a step of the environment
@@ -75,8 +159,16 @@ class Map:
         # The agents take their decision
         for agent in agents:
             agent.compute_score()
-            agent.take_decision()
-            agent.predict_sensors()
+
+        genome = self.genomes[genome_id]
+
+        directions = genome.take_decisions(np.array([agent.network_input() for agent in agents], dtype=np.float32))
+        for agent, direction in zip(agents, directions.tolist()):
+            agent.take_decision(int(direction))
+
+        predictions = genome.predict_sensors(np.array([agent.network_input() for agent in agents], dtype=np.float32))
+        for agent, prediction in zip(agents, predictions.tolist()):
+            agent.predict_sensors(prediction)
 
         # The map updates the agents' position
         for agent in agents:
@@ -84,30 +176,58 @@ class Map:
             self.agent_to_pos[genome_id][agent] = new_position
             agent.position = new_position
 
-            agent.position_history = agent.position_history[-max_record_hoziron:] + [new_position]
+        self._record_positions(genome_id, max_record_hoziron)
 
         # Checking the agents' sensors
-        pos_to_agent = reverse_dict_with_repeat(self.agent_to_pos[genome_id])
-        for agent in agents:
-            agent.reset_sensors()
-            self._detect_others(agent, pos_to_agent)
+        self._detect_others(agents)
 
-    def run(self, length:int, verbose=False, genome_to_run=None, progress_bar=False):
+    def run(self, length:int, verbose=False, genome_to_run=None, progress_bar=False, fast_forward=False):
         """
         Run the environment for a given length
+        With fast_forward, once the joint state of the agents repeats, the remaining cycles are not simulated:
+        the scores, activation counts and positions they would add are extrapolated from the last cycle
         """
 
         if progress_bar is True:
+            from progress.bar import Bar
+
             print()
             bar = Bar("Simulating a run of length {}".format(length), max=length)
 
+        genome_id = self.genome_to_show if genome_to_run is None else genome_to_run
+        visited = {} if fast_forward is True else None # state:(step, counters)
+
         self.length_sim += length
-        for _ in range(length):
-            self._step(self.genome_to_show if genome_to_run is None else genome_to_run, max_record_hoziron=length)
+        step = 0
+        while step < length:
+            self._step(genome_id, max_record_hoziron=length)
+            step += 1
         
             if verbose is True: print(self)
             if progress_bar is True:
                 bar.next()
+
+            if visited is None:
+                continue
+
+            # Looking for a state already visited, the steps are then periodic
+            state = self._state_key(genome_id)
+            if state is None:
+                visited = None
+            elif state in visited:
+                start, counters = visited[state]
+                period = step - start
+                nb_cycles = (length - step) // period
+
+                self._add_counters(genome_id, nb_cycles * (self._counters(genome_id) - counters))
+                self._repeat_history(genome_id, period, nb_cycles)
+                step += nb_cycles * period
+
+                visited = None
+                if progress_bar is True:
+                    bar.next(nb_cycles * period)
+            else:
+                visited[state] = (step, self._counters(genome_id))
         
     def reset(self, genome_to_reset=None):
         """
@@ -118,8 +238,11 @@ class Map:
         for genome, agents in self.agents.items():
             if genome_to_reset is None or genome == genome_to_reset:
                 for agent in agents:
-                    agent.reset()
+                    agent.reset(self.rng)
                     agent.position = self._init_agent_position(agent)
+
+                if genome in self.histories:
+                    self.histories[genome].clear()
     
     def __str__(self):
         text = "{}\t{} genomes \n".format(self.name, len(self.agents))
@@ -1,19 +1,76 @@
-import random
 import sys
 import math
+import numpy as np
 
-from utils import *
+from utils import reverse_dict_with_repeat
 
 from map import Map
 from agents import Agent
 
+def _count_gaps(images:np.ndarray, x:np.ndarray, bound:np.ndarray, strict:bool) -> np.ndarray:
+    """
+    Counts, for every agent, the sorted images whose gap x - image is above the bound (or equal to it if strict is False)
+    The gaps decrease along the sorted images, so the count is found by a binary search on the gaps themselves
+    """
+
+    low = np.zeros(x.shape, dtype=int)
+    high = np.full(x.shape, images.shape[-1])
+    for _ in range(images.shape[-1].bit_length()):
+        middle = (low + high) // 2
+        gaps = x - np.take_along_axis(images, np.minimum(middle, images.shape[-1] - 1), axis=-1)
+        is_above = gaps > bound if strict is True else gaps >= bound
+        is_above &= middle < high
+
+        low = np.where(is_above, middle + 1, low)
+        high = np.where(is_above, high, middle)
+
+    return low
+
+
+def detect_neighbours(positions, ring_length:float, sensor_range_0, sensor_range_1) -> np.ndarray:
+    """
+    Computes the sensors [sensor 0 left, sensor 0 right, sensor 1 left, sensor 1 right] of agents on a ring,
+    positions has shape (..., N_agents) and the sensor ranges broadcast to it
+    As with the pairwise rule, another agent is seen at the gap d = position - other position, on the right if d <= 0,
+    by sensor 0 if |d| <= sensor_range_0 and otherwise by sensor 1 if |d| <= sensor_range_1
+    The sensor ranges must be smaller than half the ring's length, so that an agent is seen through a single image
+    """
+
+    positions = np.asarray(positions, dtype=float)
+    batch_shape, nb_agents = positions.shape[:-1], positions.shape[-1]
+
+    x = positions.reshape(-1, nb_agents)
+    sensor_range_0 = np.broadcast_to(sensor_range_0, positions.shape).reshape(x.shape)
+    sensor_range_1 = np.broadcast_to(sensor_range_1, positions.shape).reshape(x.shape)
+
+    # Sorting the positions once with their periodic images, the gaps to them are computed as the pairwise rule does
+    sorted_rows = np.sort(x, axis=-1)
+    images = np.concatenate([sorted_rows - ring_length, sorted_rows, sorted_rows + ring_length], axis=-1)
+
+    # Number of images (the agent itself included) at a gap above each bound
+    above_0 = _count_gaps(images, x, 0, strict=True)
+    above_range_0 = _count_gaps(images, x, sensor_range_0, strict=True)
+    above_range_1 = _count_gaps(images, x, sensor_range_1, strict=True)
+    from_range_0 = _count_gaps(images, x, -sensor_range_0, strict=False)
+    from_range_1 = _count_gaps(images, x, -sensor_range_1, strict=False)
+
+    sensors = np.stack([
+        above_0 - above_range_0 > 0,
+        from_range_0 - above_0 > 1,
+        above_range_0 - above_range_1 > 0,
+        from_range_1 - from_range_0 > 0,
+    ], axis=-1)
+
+    return sensors.reshape(*batch_shape, nb_agents, 4)
+
+
 class Ring(Map):
     """
     A ring around which agents can turn
     """
 
-    def __init__(self, ring_length:int, resolution:float=None) -> None:
-        super().__init__()
+    def __init__(self, ring_length:int, resolution:float=None, seed=None) -> None:
+        super().__init__(seed=seed)
 
         self.name = "Ring map"
         self.ring_length = ring_length
@@ -25,7 +82,7 @@ class Ring(Map):
         Returns its position
         """
 
-        position = random.random() * self.ring_length
+        position = self.rng.random() * self.ring_length
         return  position if self.resolution is None else position - position % self.resolution
 
     def _move_agent(self, agent:Agent):
@@ -35,7 +92,7 @@ class Ring(Map):
         """
         
         position_shift = agent.direction * agent.speed
-        position_shift += agent.noise * (2 * random.random() - 1)
+        position_shift += agent.noise * (2 * self.rng.random() - 1)
 
         new_position = agent.position + position_shift
         
@@ -44,38 +101,38 @@ class Ring(Map):
         
         return new_position % self.ring_length
     
-    def _detect_others(self, agent:Agent, pos_to_agent:dict):
+    def _detect_others(self, agents:list):
         """
-        Updates the agent's sensor based on the others' positions
+        Updates the agents' sensors based on the others' positions
         """
 
-        for other_pos in pos_to_agent.keys():
-            # Erase the agent from the currently checked position
-            try:
-                pos_to_agent[other_pos].remove(agent)
-                if len(pos_to_agent[other_pos]) == 0: continue
-            except ValueError:
-                pass
-        
-            other_pos_modulo = [other_pos - self.ring_length, other_pos, other_pos + self.ring_length]
-
-            for other_modulo in other_pos_modulo:
-                diff_pos = agent.position - other_modulo
-
-                # Check if agent in range of sensor 0
-                if abs(diff_pos) <= agent.sensor_range_0:
-                    agent.sensor_0[diff_pos <= 0] = True
-                    agent.sensor_0_activation_count[diff_pos <= 0] += 1
-                    break
-                # Check if agent is not in range of sensor 0 but in range of sensor 1
-                elif abs(diff_pos) <= agent.sensor_range_1:
-                    agent.sensor_1[diff_pos <= 0] = True
-                    agent.sensor_1_activation_count[diff_pos <= 0] += 1
-                    break
-            
-            # Check if all the sensors are activated (therefore nothing more can be done)
-            if all(agent.sensor_0) and all(agent.sensor_1):
-                break
+        sensors = detect_neighbours(
+            [agent.position for agent in agents], self.ring_length,
+            np.array([agent.sensor_range_0 for agent in agents]), np.array([agent.sensor_range_1 for agent in agents]))
+
+        for agent, agent_sensors in zip(agents, sensors.tolist()):
+            agent.sensor_0 = agent_sensors[:2]
+            agent.sensor_1 = agent_sensors[2:]
+
+            # Counting the steps during which each sensor is activated
+            for i in range(2):
+                agent.sensor_0_activation_count[i] += agent.sensor_0[i]
+                agent.sensor_1_activation_count[i] += agent.sensor_1[i]
+
+    def _state_key(self, genome_id:int) -> bytes:
+        """
+        Returns the joint state of a genome's agents and of its hidden states
+        Their steps only depend on it when the positions lie on the map's lattice and without noise, otherwise returns None
+        """
+
+        agents = self.agents[genome_id]
+        if self.resolution is None or any(agent.noise != 0 for agent in agents):
+            return None
+
+        state = np.array([[agent.position, agent.direction, *agent.sensor_0, *agent.sensor_1,
+            *[-1 if pred is None else pred for pred in [*agent.sensor_0_prediction, *agent.sensor_1_prediction]]] for agent in agents], dtype=float)
+
+        return state.tobytes() + self.genomes[genome_id].hidden.numpy().tobytes()
 
     def show_console(self, genome_id=0, erase=True, stop=True):
         """
@@ -0,0 +1,165 @@
+import numpy as np
+
+from map_ring import Ring, detect_neighbours
+from random_streams import RandomStreams
+from swarm import Swarm
+
+
+class VectorizedRing(Ring):
+    """
+    A ring around which agents can turn, each genome's agents are advanced with array operations
+    """
+
+    def __init__(self, ring_length:int, resolution:float=None, seed=None) -> None:
+        super().__init__(ring_length=ring_length, resolution=resolution, seed=seed)
+
+        self.name = "Vectorized ring map"
+        self.swarms = {} # genome's id:Swarm
+
+    def _get_swarm(self, genome_id) -> Swarm:
+        """
+        Returns the arrays of a genome's agents, built from the agents if needed
+        """
+
+        if genome_id not in self.swarms:
+            self.swarms[genome_id] = Swarm.from_agents(self.genomes[genome_id], self.agents[genome_id], self.get_history(genome_id))
+
+        return self.swarms[genome_id]
+
+    def _sync_agents(self, genome_id=None) -> None:
+        """
+        Writes the arrays of the given genome (all genomes by default) back into its agents
+        """
+
+        for genome, swarm in self.swarms.items():
+            if genome_id is None or genome == genome_id:
+                swarm.sync_agents()
+                self.agent_to_pos[genome] = {agent:agent.position for agent in swarm.agents}
+
+    def _move_swarm(self, swarm:Swarm) -> None:
+        """
+        Moves all of the agents of a swarm, adds noise to the new positions
+        """
+
+        noise = self.rng.random(swarm.positions.shape) if swarm.streams is None else swarm.streams.noise(swarm.positions.shape)
+
+        position_shift = swarm.directions * swarm.speeds
+        position_shift += swarm.noises * (2 * noise - 1)
+
+        new_positions = swarm.positions + position_shift
+
+        if self.resolution is not None:
+            new_positions = new_positions - new_positions % self.resolution
+
+        swarm.positions = new_positions % self.ring_length
+
+    def _detect_swarm(self, swarm:Swarm) -> None:
+        """
+        Updates the sensors of all of the agents of a swarm based on the others' positions
+        """
+
+        swarm.sensors = detect_neighbours(swarm.positions, self.ring_length, swarm.sensor_ranges_0, swarm.sensor_ranges_1)
+        swarm.activation_counts += swarm.sensors
+
+    def _state_key(self, genome_id:int) -> bytes:
+        """
+        Returns the joint state of a genome's arrays and of its hidden states
+        Their steps only depend on it when the positions lie on the map's lattice and without noise, otherwise returns None
+        """
+
+        swarm = self._get_swarm(genome_id)
+        if self.resolution is None or np.any(swarm.noises != 0):
+            return None
+
+        return b"".join(array.tobytes() for array in [swarm.positions, swarm.directions, swarm.sensors, swarm.predictions, swarm.genome.hidden.numpy()])
+
+    def _counters(self, genome_id:int) -> np.ndarray:
+        swarm = self._get_swarm(genome_id)
+        return np.concatenate([swarm.scores[:, None], swarm.activation_counts], axis=1)
+
+    def _add_counters(self, genome_id:int, counters:np.ndarray) -> None:
+        swarm = self._get_swarm(genome_id)
+        swarm.scores += counters[:, 0]
+        swarm.activation_counts += counters[:, 1:]
+
+    def add_agent(self, genome_id:int, new_agent):
+        """
+        Add an agent to the map, its genome's arrays are rebuilt on the next step
+        """
+
+        super().add_agent(genome_id, new_agent)
+        self.swarms.pop(genome_id, None)
+
+    def remove_genome(self, genome_id:int):
+        """
+        Removes all of a genome's agents and arrays from the map
+        """
+
+        super().remove_genome(genome_id)
+        self.swarms.pop(genome_id, None)
+
+    def reset_swarm(self, swarm:Swarm, keep_predictions=True, streams:RandomStreams=None) -> None:
+        """
+        Reset a swarm with uniformly distributed positions and random directions
+        streams draws the positions, directions and noise of each swarm of the batch, by default they come from the map's generator
+        """
+
+        rng = self.rng if streams is None else streams
+
+        positions = rng.random(swarm.positions.shape) * self.ring_length
+        if self.resolution is not None:
+            positions = positions - positions % self.resolution
+
+        directions = np.where(rng.random(swarm.positions.shape) < .5, -1, 1)
+
+        swarm.reset(positions, directions, keep_predictions=keep_predictions)
+        swarm.streams = streams
+
+    def step_swarm(self, swarm:Swarm, max_record_hoziron=0) -> None:
+        """
+        Run a step of the environment for all of the agents of a swarm
+        """
+
+        # The agents take their decision
+        swarm.compute_scores()
+        swarm.take_decisions()
+        swarm.predict_sensors()
+
+        # The map updates the agents' position
+        self._move_swarm(swarm)
+        swarm.record_positions(max_record_hoziron)
+
+        # Checking the agents' sensors
+        self._detect_swarm(swarm)
+        swarm.update_metrics()
+
+    def _step(self, genome_id, max_record_hoziron=0):
+        """
+        Run a step of the environment
+        """
+
+        self.step_swarm(self._get_swarm(genome_id), max_record_hoziron=max_record_hoziron)
+
+    def run(self, length:int, verbose=False, genome_to_run=None, progress_bar=False, fast_forward=False):
+        """
+        Run the environment for a given length, then updates the agents
+        """
+
+        super().run(length, verbose=verbose, genome_to_run=genome_to_run, progress_bar=progress_bar, fast_forward=fast_forward)
+        self._sync_agents(self.genome_to_show if genome_to_run is None else genome_to_run)
+
+    def reset(self, genome_to_reset=None):
+        """
+        Reset the simulation, the arrays are rebuilt from the reset agents
+        """
+
+        self._sync_agents(genome_to_reset)
+        super().reset(genome_to_reset=genome_to_reset)
+
+        for genome in list(self.swarms):
+            if genome_to_reset is None or genome == genome_to_reset:
+                del self.swarms[genome]
+
+    def __str__(self):
+        self._sync_agents()
+        return super().__str__()
@@ -1,7 +1,5 @@
 import tkinter as tk
 
-from utils import *
-
 
 class AskMenu(tk.Frame):
     """
@@ -1,10 +1,11 @@
 import os
-import csv
-import numpy as np
 import tkinter as tk
 
-from utils import *
+from tkinter import filedialog
+
+from utils import get_time_stamp
 from menu_ask import AskMenu
+from genome_archive import write_genome, read_genome
 
 
 class GenomeMenu(tk.Frame):
@@ -107,8 +108,7 @@ class GenomeMenu(tk.Frame):
 
             self.application.genomes.remove(genome)
             del self.application.id_to_genome[genome.id]
-            del self.application.map.agents[genome.id]
-            del self.application.map.agent_to_pos[genome.id]
+            self.application.map.remove_genome(genome.id)
 
             try:
                 if self.application.map.genome_to_show == genome.id:
@@ -134,9 +134,10 @@ class GenomeMenu(tk.Frame):
         
         try:
             selected_genome = self.application.id_to_genome[self.get_selection()-1]
-            to_save = {"action_network":selected_genome.action_network, "prediction_network":selected_genome.prediction_network}
 
-            save_file(to_save)
+            path_to_save = filedialog.asksaveasfilename(defaultextension=".gen", filetypes=[("genome files", "*.gen")])
+            if len(path_to_save) != 0:
+                write_genome(path_to_save, selected_genome.action_network, selected_genome.prediction_network)
         except tk.TclError:
             pass
     
@@ -159,15 +160,16 @@ class GenomeMenu(tk.Frame):
 
     def load_genome(self):
         """
-        Loads a genome and adds it to the application
+        Loads a genome, saved by the application or pickled by its previous versions, and adds it to the application
         """
         
-        loaded_name, loaded_content = load_file()
+        path_to_load = filedialog.askopenfilename(defaultextension=".gen", filetypes=[("genome files", "*.gen *.pkl")])
 
-        if loaded_name is None:
+        if len(path_to_load) == 0:
             return
 
-        self.add_genome(parameters=loaded_content, name=loaded_name)
+        loaded_name = os.path.splitext(os.path.basename(path_to_load))[0]
+        self.add_genome(parameters=read_genome(path_to_load), name=loaded_name)
 
     def ask_evolution(self):
         """
@@ -182,54 +184,6 @@ class GenomeMenu(tk.Frame):
             print("Please add a genome to the application and select it.")
             pass
     
-    def iterate_evolution(self, nb_runs, max_generations, genome_to_evolve):
-        """
-        Returns the fitness over the generations, and the scores of the evolution process through the desired number of runs
-        """
-
-        conc_gen_fitness = []
-        conc_fitness, conc_distance, conc_entropy, conc_ratio = [], [], [], []
-        for _ in range(nb_runs):
-            print("Run {}/{}".format(_+1, nb_runs))
-            self.application.play_menu.reset_simulation()
-            gen_fitness, covered_distance, entropy, cluster_ratio = self.application.evolve(max_generations=max_generations, genome_to_evolve=genome_to_evolve)
-
-            conc_gen_fitness.append(gen_fitness)
-            conc_fitness.append(np.max(gen_fitness))
-            conc_distance.append(covered_distance)
-            conc_entropy.append(entropy)
-            conc_ratio.append(cluster_ratio)
-        
-        return conc_gen_fitness, conc_fitness, conc_distance, conc_entropy, conc_ratio
-
-    def write_evolution(self, path, output_prefix, length, is_iterated, conc_gen_fitness, conc_fitness, conc_distance, conc_entropy, conc_ratio):
-        """
-        Writes the evolution process' results in separate files with given prefix
-        """
-
-        iterated = "all" if is_iterated is True else length
-
-        with open(path.format(output_prefix, "gen_fitness", length), 'a+') as f:
-            for gen_fitness in conc_gen_fitness:
-                for step, fit in enumerate(gen_fitness):
-                    csv.writer(f).writerow((step, fit))
-
-        with open(path.format(output_prefix, "fitness", iterated), 'a+') as f:
-            for fitness in conc_fitness:
-                csv.writer(f).writerow((length, fitness))
-
-        with open(path.format(output_prefix, "distance", iterated), 'a+') as f:
-            for distance in conc_distance:
-                csv.writer(f).writerow((length, distance))
-
-        with open(path.format(output_prefix, "entropy", iterated), 'a+') as f:
-            for entropy in conc_entropy:
-                csv.writer(f).writerow((length, entropy))
-        
-        with open(path.format(output_prefix, "ratio", iterated), 'a+') as f:
-            for ratio in conc_ratio:
-                csv.writer(f).writerow((length, ratio))
-
     def start_evolution(self, output_prefix, nb_runs, max_generations):
         """
         Starts the evolution process
@@ -254,13 +208,11 @@ class GenomeMenu(tk.Frame):
         if output_prefix == "":
             output_prefix = get_time_stamp()
 
-        path = "Results/{}_{}_L={}.csv" # prefix, type, mapsize
-        
         genome_to_evolve = self.application.id_to_genome[self.selection-1]
 
         if self.check_modify_ring_length.get() == True:
             for length in self.application.play_menu.list_lengths:
                 self.application.map.ring_length = length
-                self.write_evolution(path, output_prefix, length, True, *self.iterate_evolution(nb_runs, max_generations, genome_to_evolve))
+                self.application.run_campaign(output_prefix, True, nb_runs, max_generations, genome_to_evolve)
         else:
-            self.write_evolution(path, output_prefix, self.application.map.ring_length, False, *self.iterate_evolution(nb_runs, max_generations, genome_to_evolve))
+            self.application.run_campaign(output_prefix, False, nb_runs, max_generations, genome_to_evolve)
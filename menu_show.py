@@ -1,8 +1,9 @@
 import os
 import tkinter as tk
-import matplotlib.pyplot as plt
 
-from utils import *
+from tkinter import filedialog
+
+from utils import check_selected, read_csv_files
 from menu_ask import AskMenu
 
 
@@ -50,8 +51,10 @@ class ShowMenu(tk.Frame):
         self.frame_select_csv_buttons.grid(row=3, column=1)
 
         # Filling the listbox
+        self.csv_paths = {} # Paths of the files loaded from outside of Results
         for s in os.listdir("Results"):
-            self.listbox_files.insert('end', s[:-4])
+            if s.endswith(".csv"):
+                self.listbox_files.insert('end', s[:-4])
         
         frame_separation = tk.Frame(self, **self.frame_separation_parameters)
         
@@ -92,20 +95,24 @@ class ShowMenu(tk.Frame):
             return
 
         self.listbox_files.insert("end", name_to_load)
+        self.csv_paths[name_to_load] = path_to_load
 
     @check_selected
     def show_boxplots(self, path="Results", title="", xLabel="x", yLabel="y"):
         """
-        Show the boxplot of the currently selected files
+        Show the boxplots of the currently selected files, in a single figure
         """
-        selected_file = "{}/{}.csv".format(path, self.listbox_files.get(self.selection))
-        read_csv_files(selected_file, title=title, xLabel=xLabel, yLabel=yLabel, logscale=self.check_logscale.get())
+        selected_names = [self.listbox_files.get(i) for i in self.selection]
+        selected_files = [self.csv_paths.get(name, "{}/{}.csv".format(path, name)) for name in selected_names]
+        read_csv_files(selected_files, title=title, xLabel=xLabel, yLabel=yLabel, logscale=self.check_logscale.get())
     
     def show_history(self, title="Position history", length=500):
         """
         Show the plot of the history over one run of given length
         """
 
+        import matplotlib.pyplot as plt
+
         plt.title(title)
         plt.xlabel("Time")
         plt.ylabel("Position")
@@ -124,15 +131,16 @@ class ShowMenu(tk.Frame):
         genome_selected = self.application.id_to_genome[self.selection]
 
         self.application.is_paused = True
-        self.application.map.run(length=length, genome_to_run=genome_selected.id, progress_bar=True)
+        self.application.map.run(length=length, genome_to_run=genome_selected.id, progress_bar=True, fast_forward=True)
 
         # Plotting one line for each agent
-        for agent in genome_selected.agents.values():
+        history = self.application.map.get_history(genome_selected.id).view()
+        for agent, agent_history in zip(genome_selected.agents.values(), history):
             # Cutting the history into continuous lines for prettier output
             cut_history = []
 
             last_pos = -1e9
-            for position in agent.position_history:
+            for position in agent_history:
                 if abs(position - last_pos) > 2 * agent.speed:
                     cut_history.append([])
                 
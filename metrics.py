@@ -0,0 +1,131 @@
+import numpy as np
+
+from history import PositionHistory
+
+
+def entropies(prob:np.ndarray) -> np.ndarray:
+    """
+    Computes the entropy of each of the given probabilities, 0 for the probabilities 0 and 1
+    """
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ent = -prob * np.log2(prob) - (1 - prob) * np.log2(1 - prob)
+
+    return np.where((prob > 0) & (prob < 1), ent, 0.)
+
+
+class Metric:
+    """
+    A behaviour measure of a swarm, updated after each step of a run from the swarm's arrays
+    Values have the batch shape of the swarm
+    """
+
+    name = None
+
+    def reset(self, swarm) -> None:
+        """
+        Starts a new run of the swarm
+        """
+
+        pass
+
+    def update(self, swarm) -> None:
+        """
+        Takes the last step of the swarm into account
+        """
+
+        pass
+
+    def value(self, swarm) -> np.ndarray:
+        raise NotImplementedError
+
+
+class CoveredDistance(Metric):
+    """
+    The distance covered by the agents during the last half turn of the ring, assuming all agents have the same speed
+    Only the positions of the last half turn are kept
+    """
+
+    name = "distance"
+
+    def __init__(self, ring_length:float) -> None:
+        self.ring_length = ring_length
+        self.history = None
+
+    def reset(self, swarm) -> None:
+        self.tau = 0.5 * self.ring_length / float(swarm.speeds.flat[0])
+        self.history = PositionHistory(len(swarm), horizon=int(self.tau), batch_shape=swarm.positions.shape[:-1])
+
+    def update(self, swarm) -> None:
+        self.history.append(swarm.positions)
+
+    def value(self, swarm) -> np.ndarray:
+        history = self.history.view()
+        return np.mean(np.abs(history[..., -1] - history[..., 0]), axis=-1) / self.tau
+
+
+class SensorEntropy(Metric):
+    """
+    The average entropy of the agents' sensors, from the number of steps during which each sensor was active
+    """
+
+    name = "entropy"
+
+    def reset(self, swarm) -> None:
+        self.nb_steps = 0
+
+    def update(self, swarm) -> None:
+        self.nb_steps += 1
+
+    def value(self, swarm) -> np.ndarray:
+        return np.mean(entropies(swarm.activation_counts / max(self.nb_steps, 1)), axis=(-2, -1))
+
+
+class LargestClusterRatio(Metric):
+    """
+    The ratio of the swarm in the largest cluster at the end of the run
+    Consecutive agents around the ring are in the same cluster when their distance is within the sensor range 1 of the first one
+    """
+
+    name = "ratio"
+
+    def value(self, swarm) -> np.ndarray:
+        order = np.argsort(swarm.positions, axis=-1, kind="stable")
+        positions = np.take_along_axis(swarm.positions, order, axis=-1)
+        ranges = np.take_along_axis(swarm.sensor_ranges_1, order, axis=-1)
+
+        nb_agents = positions.shape[-1]
+        if nb_agents == 1:
+            return np.ones(positions.shape[:-1])
+
+        linked = np.abs(positions - np.roll(positions, -1, axis=-1)) <= ranges # Agent i with agent i+1, the last one with the first one
+        breaks = ~linked[..., :-1]
+
+        # Size of the cluster ending at each agent
+        index = np.arange(nb_agents)
+        starts = np.where(np.concatenate([np.ones((*breaks.shape[:-1], 1), dtype=bool), breaks], axis=-1), index, 0)
+        sizes = index - np.maximum.accumulate(starts, axis=-1) + 1
+
+        # The last cluster is merged with the first one when the last and first agents are linked, unless they are already the same cluster
+        first_size = np.where(np.any(breaks, axis=-1), np.argmax(breaks, axis=-1) + 1, nb_agents)
+        largest = np.where(linked[..., -1], np.maximum(np.max(sizes, axis=-1), first_size + sizes[..., -1]), np.max(sizes, axis=-1))
+
+        return np.minimum(largest, nb_agents) / nb_agents
+
+
+METRICS = {metric.name:metric for metric in [CoveredDistance, SensorEntropy, LargestClusterRatio]}
+
+
+def make_metrics(names, ring_length:float) -> list:
+    """
+    Returns the metrics of the given names, among distance, entropy and ratio
+    """
+
+    metrics = []
+    for name in names:
+        if name not in METRICS:
+            raise ValueError("Unknown metric {}, choose among {}".format(name, list(METRICS)))
+
+        metrics.append(CoveredDistance(ring_length) if name == CoveredDistance.name else METRICS[name]())
+
+    return metrics
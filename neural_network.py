@@ -1,4 +1,5 @@
 import torch
+import numpy as np
 
 class GenomeNetwork(torch.nn.Module):
     def __init__(self, input_size=5, hidden_size=2, output_size=1) -> None:
@@ -25,6 +26,28 @@ class GenomeNetwork(torch.nn.Module):
         
         return s
 
+    def flatten_parameters(self, buffer:torch.Tensor=None) -> None:
+        """
+        Moves the network's weights into a contiguous vector, the given one or a new one, the parameters becoming views of it
+        Loading a flattened network is then a single copy into this vector
+        """
+
+        self.flat_parameters = torch.empty(self.total_size) if buffer is None else buffer
+
+        offset = 0
+        for my_nn in self.neural_networks:
+            for p in my_nn.parameters():
+                size = p.data.numel()
+                self.flat_parameters[offset:offset+size] = p.data.flatten()
+                p.data = self.flat_parameters[offset:offset+size].view(p.data.size())
+                offset += size
+
+    def __setstate__(self, state) -> None:
+        super().__setstate__(state)
+
+        # A copied or unpickled network, possibly saved before its weights were flattened, gets its own vector
+        self.flatten_parameters()
+
     def forward(self, x):
         """
         Overidden by subclasses
@@ -37,29 +60,24 @@ class GenomeNetwork(torch.nn.Module):
         Returns a vector representing the network's weights
         """
 
-        s = []
-        for my_nn in self.neural_networks:
-            s += [p.data.flatten() for p in my_nn.parameters()]
-
-        return torch.cat(s)
+        return self.flat_parameters.clone()
     
-    def from_tensor(self, from_tensor:torch.Tensor) -> None:
+    def to_numpy(self) -> list:
         """
-        Assigns the network's weights with a given flattened tensor
+        Returns the network's parameters as float32 numpy arrays, in the order of the flattened tensor, for the forward passes of numpy_network.py
         """
 
-        for my_nn in self.neural_networks:
-            for p in my_nn.parameters():
-                size = p.data.size()
+        return [p.data.numpy().astype(np.float32) for my_nn in self.neural_networks for p in my_nn.parameters()]
 
-                i, j = (size[0], 1) if len(size) == 1 else size
-                
-                p.data = from_tensor[:i*j]
-                
-                if j != 1:
-                    p.data = p.data.reshape(i,j)
+    def from_tensor(self, from_tensor) -> None:
+        """
+        Assigns the network's weights with a given flattened tensor or array-like, copied in place into the network's vector
+        """
 
-                from_tensor = from_tensor[i*j:]
+        if isinstance(from_tensor, torch.Tensor):
+            self.flat_parameters.copy_(from_tensor)
+        else:
+            self.flat_parameters.numpy()[:] = np.asarray(from_tensor, dtype=np.float32)
 
 
 class ActionNetwork(GenomeNetwork):
@@ -73,16 +91,24 @@ class ActionNetwork(GenomeNetwork):
         self.neural_networks.append(self.fully_connected2)
 
         self.total_size = self._compute_total_size()
+        self.flatten_parameters()
 
     def forward(self, x):
         with torch.no_grad():
             relu = torch.nn.ReLU()(self.fully_connected1(x))
             sig = torch.nn.Sigmoid()(self.fully_connected2(relu))
         return sig
+
+    def compute_directions(self, x:torch.Tensor) -> torch.Tensor:
+        """
+        Returns the direction (-1, 0 or 1) chosen for each row of a (N_agents x input_size) input
+        """
+
+        return torch.round(2 * self.forward(x) - 1)[:, 0]
     
 
 class PredictionNetwork(GenomeNetwork):
-    def __init__(self, input_size=5, hidden_size=4, output_size=4) -> None:
+    def __init__(self, input_size=5, hidden_size=4, output_size=4, generator:torch.Generator=None) -> None:
         super().__init__(input_size=input_size, hidden_size=hidden_size, output_size=output_size)
 
         self.fully_connected1 = torch.nn.RNN(self.input_size, self.hidden_size)
@@ -92,8 +118,10 @@ class PredictionNetwork(GenomeNetwork):
         self.neural_networks.append(self.fully_connected2)
 
         self.total_size = self._compute_total_size()
+        self.flatten_parameters()
 
-        self.hn = torch.randn(1, 1, 4)
+        # Initial hidden state, drawn from the given generator, the one of the process by default
+        self.hn = torch.randn(1, 1, self.hidden_size, generator=generator)
 
     def forward(self, x):
         with torch.no_grad():
@@ -101,3 +129,15 @@ class PredictionNetwork(GenomeNetwork):
             relu = torch.nn.ReLU()(out)
             sig = torch.nn.Sigmoid()(self.fully_connected2(relu))
         return sig
+
+    def step(self, x:torch.Tensor, hn:torch.Tensor):
+        """
+        Advances the network once for each row of a (N_agents x input_size) input, given the (1 x N_agents x hidden_size) hidden states
+        Returns the outputs and the new hidden states
+        """
+
+        with torch.no_grad():
+            out, hn = self.fully_connected1(x[None, :, :], hn)
+            relu = torch.nn.ReLU()(out[0])
+            sig = torch.nn.Sigmoid()(self.fully_connected2(relu))
+        return sig, hn
@@ -0,0 +1,65 @@
+import math
+import numpy as np
+
+
+def action_shapes(input_size=5, hidden_size=2, output_size=1) -> list:
+    """
+    Returns the shapes of the action network's parameters, in the order of the flattened genome
+    """
+
+    return [(hidden_size, input_size), (hidden_size,), (output_size, hidden_size), (output_size,)]
+
+
+def prediction_shapes(input_size=5, hidden_size=4, output_size=4) -> list:
+    """
+    Returns the shapes of the prediction network's parameters (recurrent layer, then linear layer), in the order of the flattened genome
+    """
+
+    return [(hidden_size, input_size), (hidden_size, hidden_size), (hidden_size,), (hidden_size,), (output_size, hidden_size), (output_size,)]
+
+
+def split_vectors(vectors:np.ndarray, shapes:list) -> list:
+    """
+    Splits a (batch x size) matrix of flattened networks into their parameters, each of shape (batch, *shape), without copy
+    """
+
+    parameters = []
+    for shape in shapes:
+        size = math.prod(shape)
+        parameters.append(vectors[:, :size].reshape(-1, *shape))
+        vectors = vectors[:, size:]
+
+    return parameters
+
+
+def _linear(x:np.ndarray, weight:np.ndarray, bias:np.ndarray) -> np.ndarray:
+    return np.matmul(x, np.swapaxes(weight, -1, -2)) + np.expand_dims(bias, -2)
+
+
+def _sigmoid(x:np.ndarray) -> np.ndarray:
+    return .5 * (1 + np.tanh(.5 * x))
+
+
+def action_forward(parameters:list, x:np.ndarray) -> np.ndarray:
+    """
+    Forward pass of the action network, given its parameters and a (N_agents x input_size) input
+    The parameters may have a leading batch dimension, the input is then (batch x N_agents x input_size)
+    """
+
+    weight_1, bias_1, weight_2, bias_2 = parameters
+
+    relu = np.maximum(_linear(x, weight_1, bias_1), 0)
+    return _sigmoid(_linear(relu, weight_2, bias_2))
+
+
+def prediction_step(parameters:list, x:np.ndarray, hn:np.ndarray):
+    """
+    Advances the prediction network once, given its parameters, a (N_agents x input_size) input and the (N_agents x hidden_size) hidden states
+    The parameters may have a leading batch dimension, the input and hidden states then have it too
+    Returns the outputs and the new hidden states
+    """
+
+    weight_ih, weight_hh, bias_ih, bias_hh, weight_2, bias_2 = parameters
+
+    hn = np.tanh(_linear(x, weight_ih, bias_ih + bias_hh) + np.matmul(hn, np.swapaxes(weight_hh, -1, -2)))
+    return _sigmoid(_linear(np.maximum(hn, 0), weight_2, bias_2)), hn
@@ -0,0 +1,62 @@
+import numpy as np
+
+from numpy_network import action_shapes, prediction_shapes, split_vectors, action_forward, prediction_step
+
+
+class Population:
+    """
+    A batch of genomes given as the rows of a (population x genome_dim) matrix, whose swarms are simulated in lockstep
+    The networks are evaluated with numpy, so that the simulations do not need torch
+    """
+
+    def __init__(self, solutions, nb_agents:int, hidden=None, action_sizes=(5, 2, 1), prediction_sizes=(5, 4, 4)) -> None:
+        """
+        nb_agents counts all of the agents simulated for each genome, over all of its swarms
+        The sizes of the networks are (input_size, hidden_size, output_size)
+        """
+
+        self.action_shapes = action_shapes(*action_sizes)
+        self.prediction_shapes = prediction_shapes(*prediction_sizes)
+        self.action_size = sum(int(np.prod(shape)) for shape in self.action_shapes)
+        self.hidden_size = prediction_sizes[1]
+
+        self.size = len(solutions)
+        self.hidden = np.empty((self.size, nb_agents, self.hidden_size), dtype=np.float32)
+
+        self.load(solutions, hidden=hidden)
+
+    def load(self, solutions, hidden=None) -> None:
+        """
+        Replaces the genomes with the rows of another matrix of the same size, resetting the hidden states
+        hidden is the (population x hidden_size) initial hidden state of each genome, random by default
+        """
+
+        solutions = np.asarray(solutions, dtype=np.float32)
+
+        self.action_parameters = split_vectors(solutions[:, :self.action_size], self.action_shapes)
+        self.prediction_parameters = split_vectors(solutions[:, self.action_size:], self.prediction_shapes)
+
+        # As for a new Genome, the agents of a genome start from the same random hidden state
+        if hidden is None:
+            hidden = np.random.standard_normal((self.size, self.hidden_size))
+        self.hidden[:] = np.asarray(hidden, dtype=np.float32)[:, None, :]
+
+    def __len__(self):
+        return self.size
+
+    def take_decisions(self, nn_input:np.ndarray) -> np.ndarray:
+        """
+        Returns the new direction of every agent given the (population x ... x 5) array of their networks' inputs
+        """
+
+        nn_output = action_forward(self.action_parameters, nn_input.reshape(self.size, -1, nn_input.shape[-1]))
+        return np.round(2 * nn_output - 1).reshape(nn_input.shape[:-1])
+
+    def predict_sensors(self, nn_input:np.ndarray) -> np.ndarray:
+        """
+        Returns the predicted sensors of every agent given the (population x ... x 5) array of their networks' inputs,
+        advancing the hidden states of all the agents at once
+        """
+
+        nn_output, self.hidden = prediction_step(self.prediction_parameters, nn_input.reshape(self.size, -1, nn_input.shape[-1]), self.hidden)
+        return np.round(nn_output).reshape(*nn_input.shape[:-1], -1)
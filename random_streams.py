@@ -0,0 +1,84 @@
+import hashlib
+import numpy as np
+
+
+def candidate_keys(solutions) -> list:
+    """
+    Returns a key per row of a (population x genome_dim) matrix, computed from the float32 vector as the fitness cache does
+    A candidate's streams are seeded with it, so its simulations do not depend on its position in the population
+    """
+
+    solutions = np.ascontiguousarray(np.atleast_2d(solutions), dtype=np.float32)
+    return [np.frombuffer(hashlib.sha1(row.tobytes()).digest()[:8], dtype=np.uint32).tolist() for row in solutions]
+
+
+class RandomStreams:
+    """
+    Random generators of a batch of simulations with a (candidates x runs) shape, one per (candidate, run)
+    With common random numbers the candidates share the generators of each run: they all start from the same configurations and get the same noise
+    The draws have the shape of the simulated arrays, whose leading dimensions are split among the generators
+    """
+
+    block_size = 64 # Number of steps of noise drawn at once by each generator
+
+    def __init__(self, seed, keys:list, nb_runs=1, common=False) -> None:
+        """
+        seed is an int or a list of ints, drawn from the process' generator if None, keys holds a list of ints per candidate
+        """
+
+        seed = [int(np.random.randint(2**32, dtype=np.int64))] if seed is None else np.atleast_1d(seed).tolist()
+
+        self.shape = (len(keys), nb_runs)
+        self.common = common
+
+        # Each (candidate, run) draws its initial configuration and its noise from separate generators,
+        # so that the noise does not depend on the draws of the reset
+        sources = [[]] if common is True else keys
+        seed_sequences = [np.random.SeedSequence([*seed, *key, run]).spawn(2) for key in sources for run in range(nb_runs)]
+
+        self.generators = [np.random.default_rng(initial) for initial, _ in seed_sequences]
+        self.noise_generators = [np.random.default_rng(noise) for _, noise in seed_sequences]
+
+        self._noise = None # Block of noise of each generator
+        self._noise_step = 0
+
+    def _spread(self, values:np.ndarray, shape) -> np.ndarray:
+        """
+        Gives the (N_generators x size) values of the generators the given shape, the shared ones are repeated for every candidate
+        """
+
+        values = values.reshape(1 if self.common is True else self.shape[0], self.shape[1], -1)
+        if self.common is True:
+            values = np.repeat(values, self.shape[0], axis=0)
+
+        return values.reshape(shape)
+
+    def _size(self, shape) -> int:
+        return int(np.prod(shape)) // (self.shape[0] * self.shape[1])
+
+    def random(self, shape) -> np.ndarray:
+        """
+        Returns uniform values in [0, 1) for the initial configurations
+        """
+
+        return self._spread(np.stack([generator.random(self._size(shape)) for generator in self.generators]), shape)
+
+    def standard_normal(self, shape) -> np.ndarray:
+        """
+        Returns values from the standard normal distribution for the initial configurations
+        """
+
+        return self._spread(np.stack([generator.standard_normal(self._size(shape)) for generator in self.generators]), shape)
+
+    def noise(self, shape) -> np.ndarray:
+        """
+        Returns uniform values in [0, 1) for one step of the simulations, the generators draw a block of steps at once
+        """
+
+        size = self._size(shape)
+        if self._noise is None or self._noise_step == self.block_size or self._noise.shape[-1] != size:
+            self._noise = np.stack([generator.random((self.block_size, size)) for generator in self.noise_generators])
+            self._noise_step = 0
+
+        self._noise_step += 1
+        return self._spread(self._noise[:, self._noise_step - 1], shape)
@@ -0,0 +1,193 @@
+import os
+import csv
+import json
+import uuid
+import argparse
+import numpy as np
+
+
+STORE_PATH = "Results/store" # Directory holding the chunks and their index
+RESULTS_COLUMNS = ("fitness", "distance", "entropy", "ratio") # One value per run
+
+
+class ResultsStore:
+    """
+    The results of every evolution campaign stored as numpy columns, in chunks holding the runs of a prefix and map size
+    An index holds the prefix, map size, runs and metadata of each chunk, so that reads only load the matching chunks
+    The index is only appended to, a line per chunk, so that several processes can write in the same store
+    A chunk merging others lists them in its entry, the merged chunks are then left out of the index
+    """
+
+    def __init__(self, path=STORE_PATH) -> None:
+        self.path = path
+        self.index_path = os.path.join(path, "index.jsonl")
+
+    @property
+    def index(self) -> list:
+        """
+        Returns the entries of the chunks in the index, a line being only complete once its chunk is written
+        """
+
+        if not os.path.exists(self.index_path):
+            return []
+
+        with open(self.index_path, 'r') as f:
+            entries = [json.loads(line) for line in f if line.endswith("\n")]
+
+        replaced = set(file for entry in entries for file in entry.get("replaces", []))
+        return [entry for entry in entries if entry["file"] not in replaced]
+
+    def _add_to_index(self, chunk:dict) -> None:
+        """
+        Appends the entry of a chunk to the index in a single write, so that the entries of concurrent writers do not mix
+        """
+
+        fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, (json.dumps(chunk) + "\n").encode())
+        finally:
+            os.close(fd)
+
+    def append(self, output_prefix:str, length:int, is_iterated:bool, conc_gen_fitness, conc_fitness, conc_distance, conc_entropy, conc_ratio, runs=None, metadata=None) -> dict:
+        """
+        Writes the results of a number of runs in a new chunk, runs holds their run numbers, 0 to the number of runs by default
+        metadata is any json serializable description of the runs
+        Returns the index entry of the chunk
+        """
+
+        runs = np.arange(len(conc_fitness)) if runs is None else np.asarray(runs, dtype=int)
+
+        # The fitness over generations of all runs is stored flat, with the offset of each run
+        gen_lengths = [len(gen_fitness) for gen_fitness in conc_gen_fitness]
+        columns = {
+            "run":runs,
+            "gen_fitness":np.concatenate([np.asarray(gen_fitness, dtype=float) for gen_fitness in conc_gen_fitness]) if len(conc_gen_fitness) != 0 else np.empty(0),
+            "gen_offsets":np.concatenate([[0], np.cumsum(gen_lengths)]).astype(int)}
+        for name, values in zip(RESULTS_COLUMNS, [conc_fitness, conc_distance, conc_entropy, conc_ratio]):
+            columns[name] = np.asarray(values, dtype=float)
+
+        chunk = {"prefix":output_prefix, "length":length, "is_iterated":is_iterated, "nb_runs":len(runs), "runs":runs.tolist(), "metadata":metadata}
+        return self._write_chunk(chunk, columns)
+
+    def _write_chunk(self, chunk:dict, columns:dict) -> dict:
+        """
+        Saves the columns of a chunk and adds its entry to the index, the chunks of concurrent writers get distinct names
+        """
+
+        os.makedirs(self.path, exist_ok=True)
+
+        chunk = {"file":"{}_L={}_{}.npz".format(chunk["prefix"], chunk["length"], uuid.uuid4().hex), **chunk}
+        np.savez(os.path.join(self.path, chunk["file"]), **columns)
+        self._add_to_index(chunk)
+
+        return chunk
+
+    def merge(self, chunks:list, metadata=None) -> dict:
+        """
+        Merges chunks of the same prefix and map size into a single one ordered by run, metadata is the one of the first chunk by default
+        The merged chunks are removed once the new one is in the index
+        Returns the index entry of the new chunk
+        """
+
+        data = [self._load(chunk) for chunk in chunks]
+
+        # Every run of every chunk, with its fitness over generations
+        runs = [(int(run), chunk_data, i) for chunk_data in data for i, run in enumerate(chunk_data["run"])]
+        runs.sort(key=lambda run: run[0])
+
+        gen_fitness = [chunk_data["gen_fitness"][chunk_data["gen_offsets"][i]:chunk_data["gen_offsets"][i+1]] for _, chunk_data, i in runs]
+        columns = {"run":np.array([run for run, _, _ in runs], dtype=int),
+            "gen_fitness":np.concatenate(gen_fitness) if len(runs) != 0 else np.empty(0),
+            "gen_offsets":np.concatenate([[0], np.cumsum([len(values) for values in gen_fitness])]).astype(int)}
+        for name in RESULTS_COLUMNS:
+            columns[name] = np.array([chunk_data[name][i] for _, chunk_data, i in runs], dtype=float)
+
+        merged = {"prefix":chunks[0]["prefix"], "length":chunks[0]["length"], "is_iterated":chunks[0]["is_iterated"], "nb_runs":len(runs),
+            "runs":columns["run"].tolist(), "metadata":chunks[0]["metadata"] if metadata is None else metadata,
+            "replaces":[chunk["file"] for chunk in chunks]}
+        merged = self._write_chunk(merged, columns)
+
+        for chunk in chunks:
+            if os.path.exists(os.path.join(self.path, chunk["file"])):
+                os.remove(os.path.join(self.path, chunk["file"]))
+
+        return merged
+
+    def chunks(self, output_prefix=None, lengths=None) -> list:
+        """
+        Returns the index entries of the chunks matching the prefix and map sizes, all of them by default
+        """
+
+        return [chunk for chunk in self.index
+            if (output_prefix is None or chunk["prefix"] == output_prefix) and (lengths is None or chunk["length"] in lengths)]
+
+    def prefixes(self) -> list:
+        return sorted(set(chunk["prefix"] for chunk in self.index))
+
+    def _load(self, chunk) -> dict:
+        with np.load(os.path.join(self.path, chunk["file"])) as data:
+            return dict(data)
+
+    def read(self, output_prefix=None, lengths=None, columns=RESULTS_COLUMNS) -> dict:
+        """
+        Returns the given columns of the matching runs concatenated, along with the length and run of each of them
+        """
+
+        chunks = self.chunks(output_prefix, lengths)
+        data = [self._load(chunk) for chunk in chunks]
+
+        results = {
+            "length":np.concatenate([np.full(chunk["nb_runs"], chunk["length"]) for chunk in chunks]) if len(chunks) != 0 else np.empty(0, dtype=int),
+            "run":np.concatenate([chunk_data["run"] for chunk_data in data]) if len(chunks) != 0 else np.empty(0, dtype=int)}
+        for name in columns:
+            results[name] = np.concatenate([chunk_data[name] for chunk_data in data]) if len(chunks) != 0 else np.empty(0)
+
+        return results
+
+    def read_gen_fitness(self, output_prefix=None, lengths=None) -> list:
+        """
+        Returns the fitness over generations of each matching run, as (length, run, gen_fitness) tuples
+        """
+
+        runs = []
+        for chunk in self.chunks(output_prefix, lengths):
+            data = self._load(chunk)
+            offsets = data["gen_offsets"]
+            for i, run in enumerate(data["run"]):
+                runs.append((chunk["length"], int(run), data["gen_fitness"][offsets[i]:offsets[i+1]]))
+
+        return runs
+
+    def export_csv(self, path:str, output_prefix=None, lengths=None, chunks=None) -> None:
+        """
+        Writes the matching chunks in the csv files of the graphical application, path is formatted with prefix, type and map size
+        """
+
+        chunks = self.chunks(output_prefix, lengths) if chunks is None else chunks
+        for chunk in chunks:
+            data = self._load(chunk)
+            length, offsets = chunk["length"], data["gen_offsets"]
+            iterated = "all" if chunk["is_iterated"] is True else length
+
+            with open(path.format(chunk["prefix"], "gen_fitness", length), 'a+') as f:
+                csv.writer(f).writerows((step, fit) for i in range(chunk["nb_runs"]) for step, fit in enumerate(data["gen_fitness"][offsets[i]:offsets[i+1]].tolist()))
+
+            for name in RESULTS_COLUMNS:
+                with open(path.format(chunk["prefix"], name, iterated), 'a+') as f:
+                    csv.writer(f).writerows((length, value) for value in data[name].tolist())
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Exports the results store in the csv files of the graphical application")
+
+    parser.add_argument("prefix", help="Name prefix of the exported campaign")
+    parser.add_argument("--store", default=STORE_PATH, help="Path to the results store (default {})".format(STORE_PATH))
+    parser.add_argument("--output", default="Results/{}_{}_L={}.csv", help="Path of the csv files, formatted with prefix, type and map size")
+    parser.add_argument("--lengths", type=int, nargs="*", default=None, help="Map sizes to export (default all)")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    ResultsStore(args.store).export_csv(args.output, args.prefix, args.lengths)
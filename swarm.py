@@ -0,0 +1,178 @@
+import numpy as np
+
+from history import PositionHistory
+
+
+class Swarm:
+    """
+    The agents of a genome stored as arrays, so that the whole swarm is advanced at once
+    Arrays have a shape (*batch_shape, N_agents) to advance several swarms in lockstep
+    """
+
+    def __init__(self, genome, nb_agents:int, sensor_range_0:float, sensor_range_1:float, speed:float, noise:float, batch_shape=(), record_history=True) -> None:
+        """
+        genome takes the decisions and predictions of the agents, it can be a Genome or a Population of genomes
+        """
+
+        self.genome = genome
+        self.agents = None # Agents mirrored by the arrays, if any
+
+        shape = (*batch_shape, nb_agents)
+
+        self.sensor_ranges_0 = np.broadcast_to(np.asarray(sensor_range_0, dtype=float), shape)
+        self.sensor_ranges_1 = np.broadcast_to(np.asarray(sensor_range_1, dtype=float), shape)
+        self.speeds = np.broadcast_to(np.asarray(speed, dtype=float), shape)
+        self.noises = np.broadcast_to(np.asarray(noise, dtype=float), shape)
+
+        self.positions = np.zeros(shape, dtype=float)
+        self.directions = np.ones(shape, dtype=int)
+
+        # Sensors are ordered as [sensor 0 left, sensor 0 right, sensor 1 left, sensor 1 right]
+        self.sensors = np.zeros((*shape, 4), dtype=bool)
+        self.activation_counts = np.zeros((*shape, 4), dtype=int)
+
+        # A missing prediction (-1) never matches a sensor
+        self.predictions = -np.ones((*shape, 4), dtype=np.int8)
+
+        self.scores = np.zeros(shape, dtype=int)
+
+        self.position_history = PositionHistory(nb_agents, batch_shape=batch_shape) if record_history is True else None
+        self.metrics = [] # Behaviour metrics updated at each step, see metrics.py
+        self.streams = None # Random streams of the swarms, see random_streams.py, set when the map resets them
+
+    @classmethod
+    def from_agents(cls, genome, agents:list, position_history:PositionHistory):
+        """
+        Builds the arrays of a genome's agents, recording their positions in the given history
+        """
+
+        swarm = cls(genome, len(agents),
+            sensor_range_0=[agent.sensor_range_0 for agent in agents], sensor_range_1=[agent.sensor_range_1 for agent in agents],
+            speed=[agent.speed for agent in agents], noise=[agent.noise for agent in agents])
+        swarm.agents = agents
+
+        swarm.positions = np.array([agent.position for agent in agents], dtype=float)
+        swarm.directions = np.array([agent.direction for agent in agents], dtype=int)
+
+        swarm.sensors = np.array([[*agent.sensor_0, *agent.sensor_1] for agent in agents], dtype=bool)
+        swarm.activation_counts = np.array([[*agent.sensor_0_activation_count, *agent.sensor_1_activation_count] for agent in agents], dtype=int)
+        swarm.predictions = np.array([[-1 if pred is None else pred for pred in [*agent.sensor_0_prediction, *agent.sensor_1_prediction]] for agent in agents], dtype=np.int8)
+
+        swarm.scores = np.array([agent.score for agent in agents], dtype=int)
+        swarm.position_history = position_history
+
+        return swarm
+
+    def __len__(self):
+        return self.positions.shape[-1]
+
+    def reset(self, positions:np.ndarray, directions:np.ndarray, keep_predictions=True) -> None:
+        """
+        Reset the agents to the given positions and directions, predictions are kept by default as Agent.reset does
+        """
+
+        self.positions = positions
+        self.directions = directions
+
+        if keep_predictions is False:
+            self.predictions[:] = -1
+
+        self.sensors[:] = False
+        self.activation_counts[:] = 0
+        self.scores[:] = 0
+
+        if self.position_history is not None:
+            self.position_history.clear()
+
+        for metric in self.metrics:
+            metric.reset(self)
+
+    def _network_input(self) -> np.ndarray:
+        """
+        Stacks the inputs of every agent's networks
+        """
+
+        nn_input = np.concatenate([self.directions[..., None] > 0, self.sensors], axis=-1)
+        return nn_input.astype(np.float32)
+
+    def compute_scores(self) -> None:
+        """
+        Adds the number of correct predictions to the agents' scores
+        """
+
+        self.scores += np.sum(self.sensors == self.predictions, axis=-1)
+
+    def take_decisions(self) -> None:
+        """
+        Changes the agents' directions based on the action network
+        """
+
+        self.directions = np.asarray(self.genome.take_decisions(self._network_input())).astype(int)
+
+    def predict_sensors(self) -> None:
+        """
+        Predicts the state of the agents' sensors with the prediction network, one hidden state per agent
+        """
+
+        self.predictions = np.asarray(self.genome.predict_sensors(self._network_input())).astype(np.int8)
+
+    def record_positions(self, max_record_horizon=0) -> None:
+        """
+        Adds the current positions to the history, keeping at most max_record_horizon + 1 entries (0 keeps everything)
+        """
+
+        if self.position_history is None:
+            return
+
+        self.position_history.set_horizon(None if max_record_horizon == 0 else max_record_horizon + 1)
+        self.position_history.append(self.positions)
+
+    def track(self, metrics:list) -> None:
+        """
+        Selects the behaviour metrics updated during the following runs
+        """
+
+        self.metrics = list(metrics)
+        for metric in self.metrics:
+            metric.reset(self)
+
+    def update_metrics(self) -> None:
+        """
+        Updates the behaviour metrics with the current step
+        """
+
+        for metric in self.metrics:
+            metric.update(self)
+
+    def compute_metrics(self) -> dict:
+        """
+        Returns the value of each tracked metric by name, with the batch shape
+        """
+
+        return {metric.name:metric.value(self) for metric in self.metrics}
+
+    def compute_fitness(self, length_sim:int) -> np.ndarray:
+        """
+        Returns the fitness of each swarm of the batch
+        """
+
+        return np.mean(self.scores, axis=-1) / length_sim
+
+    def sync_agents(self) -> None:
+        """
+        Writes the arrays back into the agents
+        """
+
+        for i, agent in enumerate(self.agents):
+            agent.position = float(self.positions[i])
+            agent.direction = int(self.directions[i])
+
+            agent.sensor_0 = [bool(s) for s in self.sensors[i, :2]]
+            agent.sensor_1 = [bool(s) for s in self.sensors[i, 2:]]
+            agent.sensor_0_activation_count = [int(c) for c in self.activation_counts[i, :2]]
+            agent.sensor_1_activation_count = [int(c) for c in self.activation_counts[i, 2:]]
+
+            agent.sensor_0_prediction = [None if p < 0 else bool(p) for p in self.predictions[i, :2]]
+            agent.sensor_1_prediction = [None if p < 0 else bool(p) for p in self.predictions[i, 2:]]
+
+            agent.score = int(self.scores[i])
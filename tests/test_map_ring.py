@@ -0,0 +1,88 @@
+import numpy as np
+
+from map_ring import detect_neighbours
+
+
+def detect_others(positions, ring_length, sensor_range_0, sensor_range_1) -> np.ndarray:
+    """
+    The pairwise rule of the original Ring._detect_others, each agent checks the periodic images of every other agent
+    """
+
+    sensors = np.zeros((len(positions), 4), dtype=bool)
+    for i, position in enumerate(positions):
+        for j, other_pos in enumerate(positions):
+            if i == j:
+                continue
+
+            for other_modulo in [other_pos - ring_length, other_pos, other_pos + ring_length]:
+                diff_pos = position - other_modulo
+
+                if abs(diff_pos) <= sensor_range_0[i]:
+                    sensors[i, int(diff_pos <= 0)] = True
+                    break
+                elif abs(diff_pos) <= sensor_range_1[i]:
+                    sensors[i, 2 + int(diff_pos <= 0)] = True
+                    break
+
+    return sensors
+
+
+def check_swarms(positions, ring_length, sensor_range_0, sensor_range_1) -> None:
+    """
+    Checks the sensors of a batch of swarms, sensed together and one by one, against the pairwise rule
+    """
+
+    batched = detect_neighbours(positions, ring_length, sensor_range_0, sensor_range_1)
+    for i in range(len(positions)):
+        expected = detect_others(positions[i], ring_length, sensor_range_0[i], sensor_range_1[i])
+
+        assert np.array_equal(detect_neighbours(positions[i], ring_length, sensor_range_0[i], sensor_range_1[i]), expected), positions[i]
+        assert np.array_equal(batched[i], expected), positions[i]
+
+
+def test_random_positions_and_ranges():
+    rng = np.random.default_rng(0)
+    ring_length, nb_agents = 25, 20
+
+    positions = rng.random((200, nb_agents)) * ring_length
+    sensor_range_0 = rng.uniform(.1, 2, positions.shape)
+    sensor_range_1 = sensor_range_0 + rng.uniform(0, 2, positions.shape)
+
+    check_swarms(positions, ring_length, sensor_range_0, sensor_range_1)
+
+
+def test_lattice_positions():
+    # On a lattice, the gaps between agents often equal the sensor ranges up to the rounding of the positions
+    rng = np.random.default_rng(1)
+    ring_length, nb_agents, resolution = 25, 20, .1
+
+    positions = rng.random((500, nb_agents)) * ring_length
+    positions = positions - positions % resolution
+    positions = positions + rng.choice([-1, 0, 1], size=positions.shape) * .1
+    positions = (positions - positions % resolution) % ring_length
+
+    check_swarms(positions, ring_length, np.full(positions.shape, .5), np.full(positions.shape, 1.))
+
+
+def test_gaps_at_the_sensor_ranges():
+    ring_length = 10
+    sensor_range_0, sensor_range_1 = np.full((1, 4), .5), np.full((1, 4), 1.)
+
+    # Agents exactly one sensor range apart, along the ring and across the wrap
+    check_swarms(np.array([[2., 2.5, 3.5, 7.]]), ring_length, sensor_range_0, sensor_range_1)
+    check_swarms(np.array([[0., 9.5, 9., 5.]]), ring_length, sensor_range_0, sensor_range_1)
+    check_swarms(np.array([[.9, 1.9000000000000001, 5., 9.9]]), ring_length, sensor_range_0, sensor_range_1)
+
+    # Agents at the same position see each other on the right
+    sensors = detect_neighbours([3., 3., 6., 9.], ring_length, .5, 1.)
+    assert np.array_equal(sensors[:2], [[False, True, False, False]] * 2)
+    check_swarms(np.array([[3., 3., 6., 9.]]), ring_length, sensor_range_0, sensor_range_1)
+
+
+def test_wrap_around():
+    ring_length = 25
+    rng = np.random.default_rng(2)
+
+    # Agents gathered around the origin of the ring see each other across it
+    positions = (rng.uniform(-1.5, 1.5, (200, 6)) % ring_length)
+    check_swarms(positions, ring_length, np.full(positions.shape, .5), np.full(positions.shape, 1.))
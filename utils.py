@@ -1,7 +1,5 @@
-from tkinter import filedialog
-import pickle
+import os
 import datetime
-import matplotlib.pyplot as plt
 import numpy as np
 
 
@@ -20,35 +18,6 @@ def reverse_dict_with_repeat(A_dict:dict):
     return new_dict
 
 
-def save_file(obj_saved):
-    """
-    Saves an object into a file
-    """
-
-    path_to_save = filedialog.asksaveasfilename(defaultextension=".pkl", filetypes=[("pickle files", "*.pkl")])
-    
-    try:
-        with open(path_to_save, "wb") as f:
-                pickle.dump(obj_saved, f)
-        return "saved"
-    except FileNotFoundError:
-        return "not saved"
-
-
-def load_file():
-    """
-    Loads a file and return its content
-    """
-
-    path_to_load = filedialog.askopenfilename(defaultextension=".pkl", filetypes=[("pickle files", "*.pkl")])
-
-    try:
-        with open(path_to_load, "rb") as f:
-            return path_to_load.split("/")[-1].split(".")[0], pickle.load(f)
-    except FileNotFoundError:
-        return None, None
-
-
 def check_selected(func):
     """
     Decorator to check if at least one csv file is selected in a listbox
@@ -72,33 +41,64 @@ def get_time_stamp():
     return datetime.datetime.now().strftime("%Y%m%d_%H%M")
 
 
-def read_csv_files(filename, offset=-1, title="unnamed graph", xLabel="unnamed x-axis", yLabel="unnamed y-axis", logscale=True):
+# Parsed csv files by path, along with their modification time
+_csv_cache = {}
+
+
+def read_csv_groups(filename):
     """
-    Plots boxplots from a list of csv files
+    Returns the distinct x values of a two-column csv file, and the y values of each of them
+    A parsed file is cached until it is modified
     """
 
-    with open(filename, 'r') as f:
-        rawlines = [line.replace("\n", "") for line in f.readlines()]
-    
-    lines = [tuple(map(float, line.split(","))) for line in rawlines if len(line) != 0 and line[0] != "#"]
-    
-    xData, yData = [], []
-    for line in lines:
-        xData.append(line[0])
-        yData.append(line[1])
+    path = os.path.abspath(filename)
+    mtime = os.path.getmtime(path)
 
-    data = {}
-    for i in range(len(xData)):
-        if int(xData[i]) not in data:
-            data[int(xData[i])] = []
+    if path not in _csv_cache or _csv_cache[path][0] != mtime:
+        data = np.loadtxt(path, delimiter=",", comments="#", ndmin=2).reshape(-1, 2)
 
-        data[int(xData[i])].append(yData[i])
+        # Sorting the rows by x value to cut the y values into one group per x value
+        x_data = data[:, 0].astype(int)
+        order = np.argsort(x_data, kind="stable")
+        positions, starts = np.unique(x_data[order], return_index=True)
+
+        _csv_cache[path] = (mtime, positions, np.split(data[order, 1], starts[1:]))
+
+    return _csv_cache[path][1:]
+
+
+def read_csv_files(filenames, offset=-1, title="unnamed graph", xLabel="unnamed x-axis", yLabel="unnamed y-axis", logscale=True):
+    """
+    Plots boxplots from a list of csv files, the boxplots of several files are overlaid side by side
+    """
+
+    import matplotlib.pyplot as plt
+
+    filenames = [filenames] if isinstance(filenames, str) else filenames
+    groups = [read_csv_groups(filename) for filename in filenames]
 
     # Create a figure instance
     fig, ax = plt.subplots(figsize=(9, 6))
 
     # plot data
-    ax.boxplot(list(data.values()), positions=list(data.keys()))
+    if len(groups) == 1:
+        positions, data = groups[0]
+        ax.boxplot(data, positions=positions)
+    else:
+        all_positions = np.unique(np.concatenate([positions for positions, _ in groups]))
+        width = 0.8 * (np.min(np.diff(all_positions)) if len(all_positions) > 1 else 1) / len(groups)
+
+        handles = []
+        for i, (filename, (positions, data)) in enumerate(zip(filenames, groups)):
+            color = "C{}".format(i)
+            props = {"color":color}
+            plot = ax.boxplot(data, positions=positions + (i - (len(groups) - 1) / 2) * width, widths=width, manage_ticks=False,
+                boxprops=props, whiskerprops=props, capprops=props, medianprops=props, flierprops={"markeredgecolor":color})
+
+            handles.append(plot["boxes"][0])
+
+        ax.set_xticks(all_positions)
+        ax.legend(handles, [os.path.splitext(os.path.basename(filename))[0] for filename in filenames])
 
     # Remove top axes and right axes ticks
     ax.get_xaxis().tick_bottom()
@@ -116,12 +116,3 @@ def read_csv_files(filename, offset=-1, title="unnamed graph", xLabel="unnamed x
 
     # Display
     plt.show()
-
-
-def entropy(prob):
-    """
-    Computes the entropy of the given probability
-    """
-
-    if prob <= 0 or prob >= 1:  return 0
-    return -prob * np.log2(prob) - (1 - prob) * np.log2(1 - prob)
\ No newline at end of file